@@ -0,0 +1,184 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Cross-language answer reuse
+#  One canonical English answer per (intent, state, case_type) from
+#  the large model; each language is a cached localisation of it,
+#  produced once by a cheaper translation model
+# ═══════════════════════════════════════════════════════════════
+
+import time
+import hashlib
+from typing import Awaitable, Callable, Optional
+
+from data.legal_data import STATES
+from search import QUERY_ALIASES, tokenize
+
+# Keyword → intent, checked in order against whole tokens (moved here from generate_mock_response)
+INTENT_KEYWORDS = [
+    ("rental_deposit", ["deposit", "rent", "rental", "landlord", "tenant", "किराया", "வாடகை", "అద్దె", "ভাড়া"]),
+    ("labour_wage", ["salary", "wage", "job", "employer", "labour", "वेतन", "ஊதியம்", "జీతం", "মজুরি"]),
+    ("consumer_complaint", ["consumer", "product", "refund", "defect", "ecommerce", "उत्पाद", "பொருள்"]),
+    ("domestic_violence", ["violence", "domestic", "husband", "wife", "घरेलू", "வன்முறை"]),
+]
+_INTENT_TERMS = [(intent, {t for w in words for t in tokenize(w)}) for intent, words in INTENT_KEYWORDS]
+LANGUAGE_NAMES = {"en": "English", "hi": "Hindi", "ta": "Tamil", "te": "Telugu", "bn": "Bengali"}
+
+# What counts as "the generic question" for an intent: it must use one of the intent's
+# core terms, and every other content word must be generic or intent vocabulary.
+# "What are my rights if the landlord keeps my deposit?" qualifies;
+# "My landlord wants me out next week" or "what are my rights as a wife" do not.
+GENERIC_TERMS = set(tokenize(
+    "what which who where why rights right help need should get back return returning returned "
+    "keep keeping kept give giving refuse refusing refused legal law options next step steps "
+    "document documents file filing complaint claim do about against india indian please tell "
+    "know explain"
+))
+CANONICAL_VOCABULARY = {
+    "rental_deposit": ({"deposit"}, set(tokenize("security landlord tenant rent rental house flat owner"))),
+    "labour_wage": (set(tokenize("salary wage unpaid")), set(tokenize("employer job labour dues pending paid pay company"))),
+    "consumer_complaint": (set(tokenize("defective defect refund")), set(tokenize("consumer product seller online ecommerce replacement"))),
+    "domestic_violence": (set(tokenize("violence abuse abusive beat beating")), set(tokenize("domestic husband wife in-laws family home"))),
+}
+_STATE_TERMS = {t for s in STATES.values() for t in tokenize(s["name"])}
+
+# Indic questions are matched through English terms: search.QUERY_ALIASES for legal
+# vocabulary, GENERIC_ALIASES for the words of a generic question ("my rights", "give
+# back"). Function words are dropped; any other Indic word keeps the question off reuse.
+GENERIC_ALIASES = {
+    # Hindi
+    "अधिकार": "rights", "वापस": "back", "दिया": "give", "दी": "give", "लौटा": "return", "लौटाना": "return", "मदद": "help",
+    "कानूनी": "legal", "कानून": "law", "शिकायत": "complaint", "घर": "house",
+    # Tamil
+    "உரிமைகள்": "rights", "உரிமை": "rights", "திருப்பித்": "back", "தரவில்லை": "give", "தர": "give",
+    "வைப்புத்தொகையை": "deposit", "வீட்டு": "house", "உதவி": "help", "சட்ட": "legal",
+    # Telugu
+    "హక్కులు": "rights", "తిరిగి": "back", "ఇవ్వడం": "give", "ఇవ్వలేదు": "give", "ఇంటి": "house",
+    "సహాయం": "help", "న్యాయ": "legal",
+    # Bengali
+    "অধিকার": "rights", "ফেরত": "return", "দিচ্ছে": "give", "দেয়নি": "give", "সাহায্য": "help",
+    "আইনি": "legal", "বাড়ির": "house",
+}
+INDIC_STOPWORDS = set(tokenize(
+    "मेरा मेरी मेरे मुझे मैं है हैं था थी नहीं कर करें रहा रही रहे ने को का की के में से और या क्या राशि "
+    "என் எனது என்ன நான் இல்லை மற்றும் "
+    "నా నాకు ఏమిటి ఏమి లేదు మరియు "
+    "আমার আমি না কী কি এবং"
+))
+_INDIC_TERMS = {
+    tok: tuple(tokenize(english))
+    for word, english in {**QUERY_ALIASES, **GENERIC_ALIASES}.items() for tok in tokenize(word)
+}
+
+
+def _question_terms(message: str) -> set:
+    """Each content word as the frozenset of English terms it may stand for."""
+    return {
+        frozenset(_INDIC_TERMS.get(tok, (tok,)))
+        for tok in tokenize(message) if tok not in INDIC_STOPWORDS
+    }
+
+
+def detect_intent(message: str) -> Optional[str]:
+    tokens = set(tokenize(message))
+    for intent, terms in _INTENT_TERMS:
+        if tokens & terms:
+            return intent
+    return None
+
+
+def canonical_intent(req, max_terms: int = 8) -> Optional[str]:
+    """
+    Intent of a first-turn question that is just the generic question for that intent
+    (see CANONICAL_VOCABULARY), which gets the canonical answer; None sends the request
+    to the model as before. Indic messages are matched through their English terms.
+    Unknown languages, states or a mismatched case type never reuse.
+    """
+    if req.language not in LANGUAGE_NAMES or (req.state is not None and req.state not in STATES):
+        return None
+    if req.conversation_history or any(c.isdigit() for c in req.message):
+        return None
+    words = _question_terms(req.message)
+    if not words or len(words) > max_terms:
+        return None
+    for intent, (core, extra) in CANONICAL_VOCABULARY.items():
+        allowed = core | extra | GENERIC_TERMS | _STATE_TERMS
+        # a word with several readings (యజమాని: landlord or employer) fits if any reading does
+        if any(w & core for w in words) and all(w & allowed for w in words):
+            if req.case_type is None or req.case_type == intent:
+                return intent
+    return None
+
+
+class AnswerReuse:
+    """
+    `canonical(intent, state, case_type)` and `localise(text, language)` are async
+    callables returning (text, tokens used). Canonical answers and localisations
+    live in separate caches with their own TTLs; a canonical change gets new
+    localisations because they are keyed by its content hash.
+    """
+
+    def __init__(self, canonical: Callable[..., Awaitable[tuple]], localise: Callable[..., Awaitable[tuple]],
+                 canonical_cache, localised_cache, flight):
+        self.canonical = canonical
+        self.localise = localise
+        self.canonical_cache = canonical_cache
+        self.localised_cache = localised_cache
+        self.flight = flight            # SingleFlight: one generation per key at a time
+        self.metrics: dict = {}         # language → counters
+
+    def _metrics(self, language: str) -> dict:
+        return self.metrics.setdefault(language, {
+            "served": 0, "canonical_generated": 0, "localised_generated": 0,
+            "large_model_tokens": 0, "translation_tokens": 0, "large_model_tokens_saved": 0,
+            "generation_ms": 0.0,
+        })
+
+    async def _canonical(self, intent: str, state: Optional[str], case_type: Optional[str], m: dict) -> dict:
+        key = f"{intent}|{state or '-'}|{case_type or '-'}"
+        entry = await self.canonical_cache.aget(key)
+        if entry is None:
+            async def generate():
+                text, tokens = await self.canonical(intent, state, case_type)
+                m["canonical_generated"] += 1
+                m["large_model_tokens"] += tokens
+                value = {"text": text, "tokens": tokens, "hash": hashlib.sha256(text.encode()).hexdigest()[:16]}
+                await self.canonical_cache.aset(key, value)
+                return value
+            return await self.flight.do("canonical:" + key, generate)
+        # every answer served from a stored canonical is a large-model generation avoided
+        m["large_model_tokens_saved"] += entry["tokens"]
+        return entry
+
+    async def answer(self, req, intent: str) -> str:
+        if req.language not in LANGUAGE_NAMES or (req.state is not None and req.state not in STATES):
+            raise ValueError("Answer reuse needs a supported language and state")
+        start = time.perf_counter()
+        m = self._metrics(req.language)
+        m["served"] += 1
+        canonical = await self._canonical(intent, req.state, req.case_type, m)
+        if req.language == "en":
+            text = canonical["text"]
+        else:
+            key = f"{canonical['hash']}|{req.language}"
+            text = await self.localised_cache.aget(key)
+            if text is None:
+                async def translate():
+                    out, tokens = await self.localise(canonical["text"], req.language)
+                    m["localised_generated"] += 1
+                    m["translation_tokens"] += tokens
+                    await self.localised_cache.aset(key, out)
+                    return out
+                text = await self.flight.do("localise:" + key, translate)
+        m["generation_ms"] += (time.perf_counter() - start) * 1000
+        return text
+
+    def stats(self) -> dict:
+        per_language = {
+            lang: {**{k: v for k, v in m.items() if k != "generation_ms"},
+                   "avg_latency_ms": round(m["generation_ms"] / m["served"], 1) if m["served"] else None}
+            for lang, m in self.metrics.items()
+        }
+        return {
+            "languages": per_language,
+            "large_model_tokens_saved": sum(m["large_model_tokens_saved"] for m in self.metrics.values()),
+            "translation_tokens": sum(m["translation_tokens"] for m in self.metrics.values()),
+        }
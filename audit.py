@@ -0,0 +1,302 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Write-behind audit log
+#  Handlers append events to a bounded in-memory queue and return;
+#  one writer thread group-commits them to SQLite or to rotating,
+#  gzip-compressed NDJSON segments
+# ═══════════════════════════════════════════════════════════════
+
+import os
+import glob
+import gzip
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import deque
+from typing import Optional
+
+POLICIES = ("drop_newest", "drop_oldest", "block")
+
+
+# ── STORES (used only from the writer thread, plus reads) ────────
+class SQLiteAuditStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._db = None
+        with sqlite3.connect(path) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS audit ("
+                "id INTEGER PRIMARY KEY, ts REAL, kind TEXT, session_id TEXT, data TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS audit_session ON audit (session_id, id)")
+
+    def write(self, events: list):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:  # one transaction per batch = one fsync for the whole group
+            self._db.executemany(
+                "INSERT INTO audit (ts, kind, session_id, data) VALUES (?, ?, ?, ?)",
+                [(ts, kind, session_id, json.dumps(data, ensure_ascii=False, default=str))
+                 for ts, kind, session_id, data in events],
+            )
+
+    def query(self, session_id: str, since: float = 0, limit: int = 200) -> list:
+        with sqlite3.connect(self.path) as db:
+            rows = db.execute(
+                "SELECT ts, kind, data FROM audit WHERE session_id = ? AND ts > ? ORDER BY id LIMIT ?",
+                (session_id, since, limit),
+            ).fetchall()
+        return [{"ts": ts, "kind": kind, **json.loads(data)} for ts, kind, data in rows]
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class SegmentedLogStore:
+    """
+    NDJSON segments `<prefix>-<n>.log`; a full segment is gzip-compressed to
+    `.log.gz` and only the newest `keep` segments are retained (0 = keep all).
+    Writers sharing a directory (serve.py workers) use prefixes that start with
+    `family`; query() reads all of them, so a session's trail is whole whichever
+    worker serves the read.
+    """
+
+    def __init__(self, directory: str, prefix: str = "audit", segment_bytes: int = 16 << 20, keep: int = 0,
+                 family: Optional[str] = None):
+        self.directory = directory
+        self.prefix = prefix
+        self.family = family if family is not None else prefix
+        self.segment_bytes = segment_bytes
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+        numbers = [self._number(p) for p in self._segments()]
+        self._n = max(numbers, default=0)
+        self._file = None
+
+    def _segments(self, prefix: Optional[str] = None) -> list:
+        paths = glob.glob(os.path.join(self.directory, f"{prefix or self.prefix}-*.log*"))
+        return sorted(paths, key=self._number)
+
+    def _writers(self) -> set:
+        paths = glob.glob(os.path.join(self.directory, f"{self.family}*-*.log*"))
+        return {os.path.basename(p).rsplit("-", 1)[0] for p in paths}
+
+    @staticmethod
+    def _number(path: str) -> int:
+        return int(os.path.basename(path).split("-")[-1].split(".")[0])
+
+    def _open(self):
+        if self._file is None:
+            if self._n == 0 or os.path.exists(self._path(self._n) + ".gz"):
+                self._n += 1
+            self._file = open(self._path(self._n), "ab")
+
+    def _path(self, n: int) -> str:
+        return os.path.join(self.directory, f"{self.prefix}-{n:06d}.log")
+
+    def write(self, events: list):
+        self._open()
+        self._file.write(b"".join(
+            json.dumps({"ts": ts, "kind": kind, "session_id": session_id, **data},
+                       ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+            for ts, kind, session_id, data in events
+        ))
+        self._file.flush()
+        if self._file.tell() >= self.segment_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        path = self._file.name
+        self._file.close()
+        self._file = None
+        with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+            dst.writelines(src)
+        os.remove(path)
+        if self.keep:
+            for old in self._segments()[:-self.keep]:
+                os.remove(old)
+
+    def query(self, session_id: str, since: float = 0, limit: int = 200) -> list:
+        # audit reads are rare; a scan of every writer's retained segments is fine
+        out = []
+        for prefix in self._writers():
+            out.extend(self._query_writer(prefix, session_id, since, limit))
+        out.sort(key=lambda event: event["ts"])
+        return out[:limit]
+
+    def _query_writer(self, prefix: str, session_id: str, since: float, limit: int) -> list:
+        out = []
+        needle = json.dumps(session_id)
+        paths = self._segments(prefix)
+        for path in paths:
+            if path.endswith(".gz") and path[:-3] in paths:
+                continue                    # mid-rotation: read the .log (or its .gz once it is gone)
+            for line in self._lines(path):
+                if needle not in line or not line.endswith("\n"):
+                    continue                # other session, or another worker's batch still being written
+                event = json.loads(line)
+                if event.get("session_id") == session_id and event["ts"] > since:
+                    del event["session_id"]
+                    out.append(event)
+                    if len(out) == limit:
+                        return out
+        return out
+
+    @staticmethod
+    def _lines(path: str):
+        if not path.endswith(".gz"):
+            try:
+                f = open(path, encoding="utf-8")
+            except FileNotFoundError:       # rotated (by its own writer) since the listing
+                path += ".gz"
+            else:
+                with f:
+                    yield from f
+                return
+        try:
+            f = gzip.open(path, "rt", encoding="utf-8")
+        except FileNotFoundError:           # dropped by `keep` since the listing
+            return
+        with f:
+            yield from f
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def store_from_env(spec: str, worker_id: Optional[str] = None):
+    """off | sqlite:<path> | log:<directory>"""
+    kind, _, arg = spec.partition(":")
+    if kind == "sqlite":
+        return SQLiteAuditStore(arg or "justia_audit.db")
+    if kind == "log":
+        return SegmentedLogStore(arg or "audit_logs", prefix=f"audit{worker_id or ''}", family="audit")
+    return None
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+# ── WRITE-BEHIND QUEUE ───────────────────────────────────────────
+class AuditLog:
+    """
+    record() costs a lock and a deque append; serialisation and I/O happen on
+    the writer thread, which commits whatever has queued up (≤ batch_max) in
+    one go. When the queue is full the policy decides: drop_newest (default)
+    keeps the backlog, drop_oldest keeps the latest events, block waits up to
+    block_timeout_s for room and then drops. Safe to call from any thread;
+    block only ever waits in threadpool handlers, never on the event loop,
+    where a full queue is handled as drop_newest.
+    """
+
+    def __init__(self, store, max_queue: int = 10000, policy: str = "drop_newest",
+                 batch_max: int = 1000, flush_interval_s: float = 0.05, block_timeout_s: float = 0.005):
+        if policy not in POLICIES:
+            raise ValueError(f"Audit policy must be one of {', '.join(POLICIES)}")
+        self.store = store
+        self.max_queue = max_queue
+        self.policy = policy
+        self.batch_max = batch_max
+        self.flush_interval_s = flush_interval_s
+        self.block_timeout_s = block_timeout_s
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    def record(self, kind: str, session_id: Optional[str] = None, **data):
+        if self.store is None:
+            return
+        event = (time.time(), kind, session_id, data)
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                if self.policy == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif self.policy == "block" and not self._closing and not _on_event_loop():
+                    self._cond.wait_for(lambda: len(self._queue) < self.max_queue, self.block_timeout_s)
+                if len(self._queue) >= self.max_queue:
+                    self.dropped += 1
+                    return
+            self._queue.append(event)
+            self.recorded += 1
+            if len(self._queue) >= self.batch_max:
+                self._cond.notify_all()
+
+    def start(self):
+        if self.store is not None and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # a full batch or the flush interval, whichever comes first, so events commit in groups
+                self._cond.wait_for(lambda: len(self._queue) >= self.batch_max or self._closing,
+                                    self.flush_interval_s)
+                if not self._queue:
+                    if self._closing:
+                        return
+                    continue
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.batch_max))]
+                self._cond.notify_all()         # room for "block" callers
+            self._commit(batch)
+
+    def _commit(self, batch: list):
+        try:
+            self.store.write(batch)
+        except Exception as e:
+            self.write_errors += 1
+            self.dropped += len(batch)
+            print(f"Audit write failed, {len(batch)} events lost: {e}")
+        else:
+            self.written += len(batch)
+            self.batches += 1
+
+    def close(self, timeout: float = 5.0):
+        """Flush what is queued and stop the writer."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+        self.store.close()
+
+    def query(self, session_id: str, since: float = 0, limit: int = 200) -> list:
+        return self.store.query(session_id, since, limit) if self.store is not None else []
+
+    def stats(self) -> dict:
+        return {
+            "store": type(self.store).__name__ if self.store is not None else None,
+            "policy": self.policy,
+            "queued": len(self._queue),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "avg_batch": round(self.written / self.batches, 1) if self.batches else None,
+            "write_errors": self.write_errors,
+        }
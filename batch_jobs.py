@@ -0,0 +1,267 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Bulk chat jobs
+#  Submit many ChatRequests, get a job id, poll or stream results.
+#  One background worker dedupes, groups by context prompt and runs
+#  each job through the provider batch API or a local batch backend,
+#  away from the interactive path (no shared breaker, flight or pool)
+# ═══════════════════════════════════════════════════════════════
+
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from singleflight import Broadcast
+
+
+class BatchFull(Exception):
+    """Too many jobs waiting; the client should retry later."""
+
+
+class BatchItem:
+    __slots__ = ("key", "req", "system", "messages", "indexes")
+
+    def __init__(self, key: str, req, system: str, messages: list):
+        self.key = key                  # prompt_key(): equal prompts ⇒ one upstream call
+        self.req = req
+        self.system = system
+        self.messages = messages
+        self.indexes: list = []         # positions in the submitted list
+
+
+# ── BACKENDS ─────────────────────────────────────────────────────
+class ProviderBatchBackend:
+    """
+    Anthropic Message Batches: one provider batch per job, results fetched when it ends.
+    Requests sharing a context prompt mark it cacheable so the group pays for it once.
+    """
+    source = "claude"
+
+    def __init__(self, client, model: str, poll_s: float = 30.0, max_tokens: int = 1024):
+        self.client = client
+        self.model = model
+        self.poll_s = poll_s
+        self.max_tokens = max_tokens
+
+    async def run(self, groups: list):
+        batches = self.client.messages.batches
+        requests = []
+        for group in groups:
+            system = {"type": "text", "text": group[0].system}
+            if len(group) > 1:
+                system["cache_control"] = {"type": "ephemeral"}
+            for item in group:
+                requests.append({
+                    "custom_id": item.key,
+                    "params": {"model": self.model, "max_tokens": self.max_tokens,
+                               "system": [system], "messages": item.messages},
+                })
+        batch = await asyncio.to_thread(batches.create, requests=requests)
+        while batch.processing_status != "ended":
+            await asyncio.sleep(self.poll_s)
+            batch = await asyncio.to_thread(batches.retrieve, batch.id)
+        entries = await asyncio.to_thread(lambda: list(batches.results(batch.id)))
+        for entry in entries:
+            if entry.result.type == "succeeded":
+                text = "".join(b.text for b in entry.result.message.content if b.type == "text")
+                yield entry.custom_id, text
+
+
+class LocalBatchBackend:
+    """
+    Runs the batch in-process, `concurrency` prompts at a time on a pool of its own,
+    group by group. Used when the provider batch API is unavailable (or with no key).
+    """
+
+    def __init__(self, complete: Callable[[BatchItem], str], source: str, concurrency: int = 2):
+        self.complete = complete
+        self.source = source
+        self.concurrency = max(1, concurrency)
+        self._pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="batch")
+
+    async def run(self, groups: list):
+        loop = asyncio.get_running_loop()
+        items = [item for group in groups for item in group]
+        for i in range(0, len(items), self.concurrency):
+            chunk = items[i:i + self.concurrency]
+            futures = [loop.run_in_executor(self._pool, self.complete, item) for item in chunk]
+            for item, result in zip(chunk, await asyncio.gather(*futures, return_exceptions=True)):
+                if isinstance(result, Exception):
+                    print(f"Batch prompt {item.key[:8]} failed: {result!r}")
+                    continue
+                yield item.key, result
+
+
+# ── JOBS ─────────────────────────────────────────────────────────
+class BatchJob:
+    def __init__(self, items: list, total: int):
+        self.id = uuid.uuid4().hex
+        self.items = items                      # unique prompts, grouped order
+        self.total = total
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.results: list = [None] * total
+        self.stream = Broadcast()               # result dicts in completion order
+        self.counts = {"claude": 0, "cache": 0, "mock": 0}
+
+    @property
+    def groups(self) -> int:
+        return len({item.system for item in self.items})
+
+    def deliver(self, item: BatchItem, reply: str, source: str):
+        self.counts[source] = self.counts.get(source, 0) + 1
+        for i in item.indexes:
+            result = {"index": i, "reply": reply, "source": source}
+            self.results[i] = result
+            self.stream.push(result)
+
+    def as_dict(self, offset: int = 0, limit: Optional[int] = None) -> dict:
+        done = sum(r is not None for r in self.results)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "unique": len(self.items),
+            "groups": self.groups,
+            "completed": done,
+            "sources": self.counts,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "results": page(self.results, offset, limit),
+        }
+
+
+def page(results: list, offset: int = 0, limit: Optional[int] = None) -> list:
+    """
+    Completed results whose submission index is in [offset, offset + limit).
+    Works on a job's positional list and on a published snapshot's completed-only
+    list alike, so a page means the same thing whichever worker answers the poll.
+    """
+    end = None if limit is None else offset + limit
+    return [r for r in results if r is not None and r["index"] >= offset and (end is None or r["index"] < end)]
+
+
+class BatchRunner:
+    """
+    FIFO of jobs, worked one at a time by run(). `backend()` is resolved per job.
+    Prompts answered by the backend are stored in `cache` (the reply cache shared
+    with /api/chat); prompts it could not answer get `fallback(item)`. Job snapshots
+    go to `shared` when it changes status, so other serve.py workers can answer polls.
+    """
+
+    def __init__(self, backend: Callable, fallback: Callable[[BatchItem], str], cache=None, shared=None,
+                 max_pending: int = 16, max_items: int = 1000, keep_s: float = 86400):
+        self.backend = backend
+        self.fallback = fallback
+        self.cache = cache
+        self.shared = shared
+        self.max_pending = max_pending
+        self.max_items = max_items
+        self.keep_s = keep_s
+        self.jobs: OrderedDict = OrderedDict()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.submitted = 0
+        self.prompts_sent = 0
+        self.duplicates = 0
+
+    def check(self, count: int):
+        """Raises ValueError or BatchFull if a job of `count` requests would be refused."""
+        if not count:
+            raise ValueError("At least one request is required")
+        if count > self.max_items:
+            raise ValueError(f"At most {self.max_items} requests per job")
+        if self._queue.qsize() >= self.max_pending:
+            raise BatchFull(f"{self._queue.qsize()} jobs already waiting")
+
+    async def submit(self, entries: list) -> BatchJob:
+        """entries: [(key, req, system, messages), ...] in submission order."""
+        self.check(len(entries))
+        self._evict()
+
+        unique: dict = {}
+        for i, (key, req, system, messages) in enumerate(entries):
+            item = unique.get(key)
+            if item is None:
+                item = unique[key] = BatchItem(key, req, system, messages)
+            item.indexes.append(i)
+        # same context prompt ⇒ adjacent, so its prefix is reused within the batch
+        order = {}
+        items = sorted(unique.values(), key=lambda it: order.setdefault(it.system, len(order)))
+
+        job = BatchJob(items, len(entries))
+        self.jobs[job.id] = job
+        self.submitted += 1
+        self.duplicates += len(entries) - len(items)
+        self._queue.put_nowait(job)
+        await self._publish(job)
+        return job
+
+    async def _publish(self, job: BatchJob):
+        if self.shared is not None:
+            await self.shared.aset(job.id, job.as_dict())
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self.jobs.get(job_id)
+
+    def _evict(self):
+        cutoff = time.time() - self.keep_s
+        for job_id in [j.id for j in self.jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    async def run(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception as e:
+                print(f"Batch job {job.id} failed: {e!r}")
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+                job.stream.finish()
+                await self._publish(job)
+
+    async def _process(self, job: BatchJob):
+        job.status = "running"
+        await self._publish(job)
+        pending = {}
+        for item in job.items:
+            cached = await self.cache.aget(item.key) if self.cache else None
+            if cached is not None:
+                job.deliver(item, cached, "cache")
+            else:
+                pending[item.key] = item
+
+        if pending:
+            groups: dict = {}
+            for item in pending.values():
+                groups.setdefault(item.system, []).append(item)
+            backend = self.backend()
+            self.prompts_sent += len(pending)
+            try:
+                async for key, reply in backend.run(list(groups.values())):
+                    item = pending.pop(key, None)
+                    if item is None:
+                        continue
+                    job.deliver(item, reply, backend.source)
+                    if self.cache and backend.source == "claude":
+                        await self.cache.aset(key, reply)
+            except Exception as e:
+                print(f"Batch backend error, answering {len(pending)} prompts locally: {e}")
+
+        # whatever the backend could not answer still gets a reply, like /api/chat
+        for item in pending.values():
+            job.deliver(item, self.fallback(item), "mock")
+        job.status = "completed"
+
+    def stats(self) -> dict:
+        return {
+            "jobs": len(self.jobs),
+            "queued": self._queue.qsize(),
+            "submitted": self.submitted,
+            "prompts_sent": self.prompts_sent,
+            "duplicates_removed": self.duplicates,
+        }
@@ -0,0 +1,21 @@
+"""Makes the app modules importable from bench/ (python bench/<script>.py)."""
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# The app imports `data.legal_data`; in a checkout the module sits at the repo root
+try:
+    import data.legal_data  # noqa: F401
+except ImportError:
+    import legal_data
+    data = types.ModuleType("data")
+    data.__path__ = []
+    data.legal_data = legal_data
+    sys.modules["data"] = data
+    sys.modules["data.legal_data"] = legal_data
+
+os.environ.setdefault("JUSTIA_AUDIT", "off")
@@ -0,0 +1,127 @@
+"""
+user-039: generation latency and large-model tokens saved by cross-language answer reuse.
+
+    python bench/bench_answers.py [--requests 2000] [--concurrency 200]
+
+Replays first-turn questions in all five languages across several states. Most are
+the generic question for an intent, in that language; the rest are specific and
+always go to the model. The models are stubs with fixed latency and token counts
+(--large-ms/--large-tokens for a fresh or canonical answer, --translate-ms/
+--translate-tokens for a localisation). Each question is answered once with reuse
+(canonical_intent → AnswerReuse) and once as before (every request to the large model).
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import _path  # noqa: F401
+from answers import AnswerReuse, LANGUAGE_NAMES, canonical_intent
+from cache import Cache
+from singleflight import SingleFlight
+
+GENERIC = {
+    "en": ["What are my rights if the landlord keeps my deposit?",
+           "What are my rights against domestic violence by my husband?"],
+    "hi": ["मकान मालिक मेरी सुरक्षा जमा राशि वापस नहीं कर रहा, मेरे अधिकार क्या हैं?",
+           "पति की घरेलू हिंसा, मेरे अधिकार क्या हैं?"],
+    "ta": ["வீட்டு உரிமையாளர் என் வைப்புத்தொகையை திருப்பித் தரவில்லை, என் உரிமைகள் என்ன?"],
+    "te": ["ఇంటి యజమాని నా డిపాజిట్ తిరిగి ఇవ్వడం లేదు, నా హక్కులు ఏమిటి?"],
+    "bn": ["বাড়িওয়ালা আমার জামানত ফেরত দিচ্ছে না, আমার অধিকার কী?"],
+}
+SPECIFIC = "My landlord deducted painting charges of 8000 from my deposit of 30000"
+STATES = ["karnataka", "maharashtra", "delhi", "tamil_nadu", "west_bengal", None]
+
+
+class Req:
+    def __init__(self, message: str, language: str, state):
+        self.message = message
+        self.language = language
+        self.state = state
+        self.case_type = None
+        self.conversation_history = []
+
+
+def workload(n: int, generic_share: float, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    reqs = []
+    for _ in range(n):
+        language = rng.choice(list(LANGUAGE_NAMES))
+        message = rng.choice(GENERIC[language]) if rng.random() < generic_share else SPECIFIC
+        reqs.append(Req(message, language, rng.choice(STATES)))
+    return reqs
+
+
+async def replay(reqs: list, concurrency: int, answer) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    per_language = {lang: [] for lang in LANGUAGE_NAMES}
+
+    async def one(req):
+        async with sem:
+            start = time.perf_counter()
+            await answer(req)
+            per_language[req.language].append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(r) for r in reqs))
+    return per_language
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--generic-share", type=float, default=0.7)
+    parser.add_argument("--large-ms", type=float, default=800)
+    parser.add_argument("--large-tokens", type=int, default=900)
+    parser.add_argument("--translate-ms", type=float, default=200)
+    parser.add_argument("--translate-tokens", type=int, default=1100)
+    args = parser.parse_args()
+    large = {"calls": 0, "tokens": 0}
+
+    async def large_model(intent="fresh", state=None, case_type=None):
+        large["calls"] += 1
+        large["tokens"] += args.large_tokens
+        await asyncio.sleep(args.large_ms / 1000)
+        return f"answer for {intent} in {state}", args.large_tokens
+
+    async def translate(text, language):
+        await asyncio.sleep(args.translate_ms / 1000)
+        return f"[{language}] {text}", args.translate_tokens
+
+    reuse = AnswerReuse(large_model, translate, Cache("bench_canonical", ttl=3600),
+                        Cache("bench_localised", ttl=3600), SingleFlight())
+
+    async def with_reuse(req):
+        intent = canonical_intent(req)
+        if intent:
+            await reuse.answer(req, intent)
+        else:
+            await large_model()
+
+    reqs = workload(args.requests, args.generic_share)
+    reused = sum(canonical_intent(r) is not None for r in reqs)
+    print(f"{len(reqs):,} first-turn questions, {reused:,} ({reused / len(reqs):.0%}) generic, "
+          f"concurrency {args.concurrency}")
+
+    base = asyncio.run(replay(reqs, args.concurrency, lambda req: large_model()))
+    base_tokens = large["tokens"]
+    large.update(calls=0, tokens=0)
+    got = asyncio.run(replay(reqs, args.concurrency, with_reuse))
+
+    stats = reuse.stats()["languages"]
+    print(f"{'':4}{'reqs':>6}{'reused':>8}{'mean before':>13}{'mean after':>12}{'canonical':>11}"
+          f"{'localised':>11}{'transl. tok':>13}")
+    for lang in LANGUAGE_NAMES:
+        m = stats.get(lang, {})
+        print(f"{lang:4}{len(got[lang]):>6}{m.get('served', 0):>8}"
+              f"{statistics.fmean(base[lang]) * 1000:>11.0f}ms{statistics.fmean(got[lang]) * 1000:>10.0f}ms"
+              f"{m.get('canonical_generated', 0):>11}{m.get('localised_generated', 0):>11}"
+              f"{m.get('translation_tokens', 0):>13,}")
+    translation = reuse.stats()["translation_tokens"]
+    print(f"large-model tokens: {base_tokens:,} before, {large['tokens']:,} after "
+          f"({1 - large['tokens'] / base_tokens:.0%} saved); translation tokens added: {translation:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+user-040: latency the audit log adds to a request at a steady request rate.
+
+    python bench/bench_audit.py [--rate 5000] [--seconds 5]
+
+Replays `rate` chat-sized requests per second on one thread. Each request
+serialises a reply and records one chat event, as /api/chat does. The time taken
+by each request includes any stretch where the writer thread holds the GIL
+mid-request. The run is repeated with auditing off and with the SQLite and
+NDJSON log stores. "added" is the difference from the off run. On a shared or
+single-core box the tail varies between runs, so repeat the run before trusting
+one p99.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import _path  # noqa: F401
+from audit import AuditLog, SegmentedLogStore, SQLiteAuditStore
+
+MESSAGE = "My landlord has not returned my security deposit of 50000 rupees after I vacated the flat"
+REPLY = "Under the Model Tenancy Act the landlord must refund the deposit at the time of handing over. " * 16
+
+
+def handle(log: AuditLog, i: int):
+    body = json.dumps({"reply": REPLY, "session_id": f"s{i % 5000}", "source": "mock"})
+    log.record("chat", f"s{i % 5000}", message=MESSAGE, language="en", state="karnataka",
+               case_type="rental_deposit", reply=REPLY, source="mock")
+    return body
+
+
+def run(log: AuditLog, rate: int, seconds: float) -> list:
+    log.start()
+    n = int(rate * seconds)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(n):
+        target = start + i / rate
+        wait = target - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        begin = time.perf_counter()
+        handle(log, i)
+        latencies.append(time.perf_counter() - begin)
+    took = time.perf_counter() - start
+    drain = time.perf_counter()
+    log.close()
+    stats = log.stats()
+    print(f"  {n / took:>8,.0f} req/s achieved, drained in {(time.perf_counter() - drain) * 1000:.0f}ms, "
+          f"written {stats['written']:,}, dropped {stats['dropped']:,}, avg batch {stats['avg_batch']}")
+    return latencies
+
+
+def record_cost(log: AuditLog, n: int = 100_000) -> float:
+    # record() alone, writer stopped so the queue only grows
+    log.max_queue = n
+    start = time.perf_counter()
+    for i in range(n):
+        log.record("chat", f"s{i}", message=MESSAGE, reply=REPLY)
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix="justia-bench-")
+    stores = {
+        "off": lambda: None,
+        "sqlite": lambda: SQLiteAuditStore(os.path.join(directory, "audit.db")),
+        "log": lambda: SegmentedLogStore(os.path.join(directory, "logs"), segment_bytes=4 << 20, keep=4),
+    }
+    print(f"{args.rate:,} req/s for {args.seconds:g}s, one chat event per request")
+    try:
+        results = {}
+        for name, make in stores.items():
+            print(name)
+            results[name] = run(AuditLog(make()), args.rate, args.seconds)
+        print(f"{'':8}{'mean':>9}{'p50':>9}{'p99':>9}{'added mean':>12}{'added p99':>11}{'record()':>10}")
+        base = results["off"]
+        base_q = statistics.quantiles(base, n=100)
+        for name, lat in results.items():
+            q = statistics.quantiles(lat, n=100)
+            cost = record_cost(AuditLog(stores[name]()))
+            print(f"{name:8}{statistics.fmean(lat) * 1e6:>7.1f}us{q[49] * 1e6:>7.1f}us{q[98] * 1e6:>7.1f}us"
+                  f"{(statistics.fmean(lat) - statistics.fmean(base)) * 1e6:>10.1f}us"
+                  f"{(q[98] - base_q[98]) * 1e6:>9.1f}us{cost * 1e6:>8.2f}us")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+user-033: records/sec for the deposit calculator, bulk (NumPy) vs one deposit_claim() per record.
+
+    python bench/bench_calculator.py [records]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import _path  # noqa: F401
+from calculator import deposit_claim, deposit_claims_bulk
+
+AS_OF = date(2025, 6, 1)
+
+
+def records(n: int) -> list:
+    rng = random.Random(1)
+    out = []
+    for _ in range(n):
+        vacated = date(2019, 1, 1) + timedelta(days=rng.randrange(2300))
+        out.append({
+            "deposit_amount": rng.choice([20000, 50000, 100000]),
+            "vacated_on": vacated.isoformat(),            # as the JSON endpoint receives them
+            "refunded_on": (vacated + timedelta(days=rng.randrange(400))).isoformat() if rng.random() < 0.3 else None,
+            "monthly_rent": rng.choice([10000, 25000, None]),
+        })
+    return out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rows = records(n)
+
+    start = time.perf_counter()
+    for r in rows:
+        deposit_claim(r["deposit_amount"], date.fromisoformat(r["vacated_on"]),
+                      date.fromisoformat(r["refunded_on"]) if r["refunded_on"] else None,
+                      monthly_rent=r["monthly_rent"], as_of=AS_OF)
+    single = time.perf_counter() - start
+
+    deposit_claims_bulk(rows[:10], as_of=AS_OF)           # numpy import outside the timing
+    start = time.perf_counter()
+    deposit_claims_bulk(rows, as_of=AS_OF)
+    bulk = time.perf_counter() - start
+
+    print(f"{n:,} tenancies")
+    print(f"  deposit_claim() loop   {n / single:>12,.0f} records/s  ({single * 1000:,.0f}ms)")
+    print(f"  deposit_claims_bulk()  {n / bulk:>12,.0f} records/s  ({bulk * 1000:,.0f}ms)  {single / bulk:.1f}× faster")
+
+
+if __name__ == "__main__":
+    main()
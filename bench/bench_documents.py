@@ -0,0 +1,72 @@
+"""
+user-031: documents/sec for the notice generator.
+
+    python bench/bench_documents.py [count]
+
+Single documents through render_document() (compiled templates, HTML and PDF),
+then render_batch() serially and through the spawn process pool.
+"""
+import io
+import os
+import sys
+import time
+import zipfile
+from itertools import cycle, islice
+
+import _path  # noqa: F401
+import documents
+from data.legal_data import STATES
+from documents import DOCUMENTS, render_batch, render_document, shutdown_pool
+
+FACTS = {
+    "rental_deposit": {"tenant_name": "Asha Rao", "tenant_address": "12 MG Road", "landlord_name": "R. Mehta",
+                       "landlord_address": "4 Park Street", "property_address": "Flat 3, 12 MG Road",
+                       "deposit_amount": "60000", "vacated_on": "2024-03-31"},
+    "labour_wage": {"employee_name": "Ravi Kumar", "employee_address": "7 Station Road", "employer_name": "ABC Ltd",
+                    "employer_address": "Industrial Area", "amount_due": "45000", "period": "Jan–Mar 2024"},
+    "consumer_complaint": {"complainant_name": "Meena Iyer", "complainant_address": "9 Lake View",
+                           "opposite_party": "XYZ Electronics", "opposite_party_address": "Mall Road",
+                           "product": "Refrigerator", "purchase_date": "2024-01-10", "amount": "32000",
+                           "defect": "Stopped cooling within a week"},
+}
+
+
+def items(n: int, fmt: str) -> list:
+    languages = ("en",) if fmt == "pdf" else ("en", "hi")      # PDF is English-only
+    combos = [(ct, st, lang) for ct in DOCUMENTS for st in STATES for lang in languages]
+    return [{"case_type": ct, "state": st, "language": lang, "facts": FACTS[ct], "format": fmt}
+            for ct, st, lang in islice(cycle(combos), n)]
+
+
+def rate(label: str, n: int, fn):
+    start = time.perf_counter()
+    fn()
+    took = time.perf_counter() - start
+    print(f"{label:38}{n / took:>10,.0f} docs/s  ({took * 1000:,.0f}ms for {n:,})")
+
+
+def serial_zip(batch: list) -> bytes:
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, item in enumerate(batch):
+            zf.writestr(f"{i:05d}.{item['format']}", documents._render_one(item)[0])
+    return out.getvalue()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{os.cpu_count()} CPUs")
+    for fmt in ("html", "pdf"):
+        batch = items(n, fmt)
+        rate(f"render_document, {fmt}", n, lambda: [
+            render_document(i["case_type"], i["state"], i["language"], i["facts"], fmt) for i in batch])
+    for fmt in ("html", "pdf"):
+        batch = items(n, fmt)
+        rate(f"serial + zip, {fmt}", n, lambda: serial_zip(batch))
+        render_batch(items(64, fmt))                        # start the pool outside the timing
+        rate(f"render_batch pool + zip, {fmt}", n, lambda: render_batch(batch))
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+user-028: per-worker memory under serve.py and cross-worker hit rate of the shared cache.
+
+    python bench/bench_prefork.py [--workers 4] [--lookups 20000]
+
+1. Starts serve.py (mock mode) and samples /api/health over fresh connections until
+   every worker has answered; reports RSS and, where /proc allows, PSS (RSS with
+   copy-on-write pages split between the processes sharing them).
+2. Runs the cache tier the way the workers do: one cache server, N forked clients
+   looking up a Zipf-distributed key space and filling misses; reports hit rate,
+   the share of hits written by another worker, and get() latency.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from _path import ROOT
+from cache import Cache, run_cache_server
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def pss_mb(pid: int):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+
+
+def worker_memory(workers: int) -> dict:
+    port = free_port()
+    env = {k: v for k, v in os.environ.items() if k != "ANTHROPIC_API_KEY"}
+    env.update(JUSTIA_AUDIT="off", PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    launcher = "import _path, runpy; runpy.run_path('serve.py', run_name='__main__')"
+    proc = subprocess.Popen([sys.executable, "-c", launcher, "--workers", str(workers), "--port", str(port),
+                             "--host", "127.0.0.1"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    seen = {}
+    try:
+        deadline = time.monotonic() + 60
+        while len(seen) < workers and time.monotonic() < deadline:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                conn.request("GET", "/api/health")
+                worker = json.loads(conn.getresponse().read())["worker"]
+                conn.close()
+                seen[worker["id"]] = worker
+            except (OSError, http.client.HTTPException):
+                time.sleep(0.2)
+        for worker in seen.values():
+            worker["pss_mb"] = pss_mb(worker["pid"])
+        return seen
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+
+def cache_client(worker: int, lookups: int, keys: int, out):
+    cache = Cache("bench", ttl=600)
+    rng = random.Random(worker)
+    weights = [1 / (k + 1) for k in range(keys)]
+    latencies = []
+    for key in rng.choices(range(keys), weights, k=lookups):
+        start = time.perf_counter()
+        value = cache.get(str(key))
+        latencies.append(time.perf_counter() - start)
+        if value is None:
+            cache.set(str(key), "x" * 2000)     # a typical reply
+    out.put({**cache.stats(), "p50_us": statistics.median(latencies) * 1e6,
+             "p99_us": statistics.quantiles(latencies, n=100)[98] * 1e6})
+
+
+def cache_hit_rate(workers: int, lookups: int, keys: int) -> list:
+    ctx = multiprocessing.get_context("fork")
+    directory = tempfile.mkdtemp(prefix="justia-bench-")
+    address, authkey = os.path.join(directory, "cache.sock"), os.urandom(16)
+    server = ctx.Process(target=run_cache_server, args=(address, authkey), daemon=True)
+    server.start()
+    time.sleep(0.3)
+    os.environ["JUSTIA_CACHE_ADDR"], os.environ["JUSTIA_CACHE_AUTHKEY"] = address, authkey.hex()
+    out = ctx.Queue()
+    clients = [ctx.Process(target=cache_client, args=(w, lookups, keys, out)) for w in range(workers)]
+    for c in clients:
+        c.start()
+    results = [out.get() for _ in clients]
+    for c in clients:
+        c.join()
+    server.terminate()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"serve.py --workers {args.workers}")
+    for wid, w in sorted(worker_memory(args.workers).items()):
+        print(f"  worker {wid}: rss {w['rss_mb']}MB  pss {w['pss_mb']}MB")
+
+    print(f"shared cache, {args.workers} workers × {args.lookups} lookups over {args.keys} keys (Zipf)")
+    results = cache_hit_rate(args.workers, args.lookups, args.keys)
+    for i, r in enumerate(results):
+        print(f"  client {i}: hit rate {r['hit_rate']:.1%}  cross-worker {r['cross_worker_hit_rate']:.1%}"
+              f"  get p50 {r['p50_us']:.0f}µs p99 {r['p99_us']:.0f}µs")
+    hits = sum(r["hits"] for r in results)
+    lookups = hits + sum(r["misses"] for r in results)
+    print(f"  overall: hit rate {hits / lookups:.1%}, "
+          f"cross-worker {sum(r['cross_worker_hits'] for r in results) / lookups:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+user-030: resident memory of court cases / NGOs as list-of-dicts vs compact records.
+
+    python bench/bench_records_memory.py [rows]      # default 1,000,000
+
+Synthesises `rows` cases from the MOCK_COURT_CASES templates (varied case numbers,
+parties and dates, repeated courts/judges/statuses like real eCourts data). Each
+representation is built in a fresh interpreter, and the script reports RSS growth over
+that interpreter's baseline after imports. Records are built from a row iterator,
+as a real load should be, so the two dict-free numbers are directly comparable.
+"""
+import gc
+import subprocess
+import sys
+from datetime import date, timedelta
+
+import _path  # noqa: F401
+from data.legal_data import MOCK_COURT_CASES, NGOS
+from records import NGO, CourtCaseTable
+
+
+def synthetic_cases(n: int):
+    base = date(2024, 1, 1)
+    for i in range(n):
+        t = MOCK_COURT_CASES[i % len(MOCK_COURT_CASES)]
+
+        def day(k: int) -> str:
+            return (base + timedelta(days=(i * 7 + k) % 700)).isoformat()
+        yield {
+            **t,
+            "case_number": f"CC/{i:07d}/2024",
+            "petitioner": f"Petitioner {i}",
+            "respondent": f"Respondent {i}",
+            # fresh strings, as a JSON/DB load would produce
+            "court": "".join(t["court"]), "judge": "".join(t["judge"]),
+            "status": "".join(t["status"]), "stage": "".join(t["stage"]),
+            "filed_date": day(0), "last_hearing": day(30), "next_hearing": day(60),
+            "orders": [{"date": day(k), "order": "".join(o["order"])} for k, o in enumerate(t["orders"])],
+        }
+
+
+def synthetic_ngos(n: int):
+    for i in range(n):
+        d = NGOS[i % len(NGOS)]
+        yield dict(d, name=f"{d['name']} {i}")
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("VmRSS not found")
+
+
+BUILDERS = {
+    "case dicts": lambda n: list(synthetic_cases(n)),
+    "case records": lambda n: CourtCaseTable.from_dicts(synthetic_cases(n)),
+    "ngo dicts": lambda n: list(synthetic_ngos(n)),
+    "ngo records": lambda n: [NGO.from_dict(d) for d in synthetic_ngos(n)],
+}
+
+
+def child(kind: str, n: int):
+    gc.collect()
+    before = rss_bytes()
+    obj = BUILDERS[kind](n)
+    gc.collect()
+    print(rss_bytes() - before)
+    assert len(obj) == n
+
+
+def measure(kind: str, n: int) -> int:
+    out = subprocess.run([sys.executable, __file__, "--child", kind, str(n)],
+                         check=True, capture_output=True, text=True)
+    return int(out.stdout)
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        return child(sys.argv[2], int(sys.argv[3]))
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    ngo_n = max(10_000, n // 100)          # fewer would not move RSS by a page
+    print("RSS growth per representation (fresh process each)")
+    print(f"{'':24}{'dicts':>12}{'records':>12}{'saved':>9}")
+    for label, count, prefix in (("court cases", n, "case"), ("ngos", ngo_n, "ngo")):
+        a, b = measure(f"{prefix} dicts", count), measure(f"{prefix} records", count)
+        print(f"{label + f' ({count:,})':24}{a / 2**20:>10.1f}MB{b / 2**20:>10.1f}MB{1 - b / a:>9.0%}")
+        print(f"  bytes/row: {a / count:.0f} as dict, {b / count:.0f} as record")
+
+
+if __name__ == "__main__":
+    main()
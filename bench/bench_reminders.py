@@ -0,0 +1,95 @@
+"""
+user-035: reminder scheduling and dispatch throughput, snapshot size and save/load time.
+
+    python bench/bench_reminders.py [subscriptions]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import _path  # noqa: F401
+import reminders
+from reminders import ReminderScheduler
+
+
+class Case:
+    __slots__ = ("case_number", "court", "next_hearing")
+
+    def __init__(self, i: int):
+        self.case_number = f"CC/{i:07d}/2024"
+        self.court = "District Consumer Commission"
+        self.next_hearing = (date.today() + timedelta(days=3 + i % 300)).toordinal()
+
+
+class NullSink:
+    async def send(self, events):
+        pass
+
+
+def timed(label: str, n: int, fn):
+    start = time.perf_counter()
+    result = fn()
+    took = time.perf_counter() - start
+    print(f"  {label:34}{n / took:>12,.0f}/s  ({took * 1000:,.0f}ms)")
+    return result
+
+
+async def persist_stall(s: ReminderScheduler) -> tuple:
+    """Longest event-loop gap seen by a 1ms ticker while _tick() persists the schedule."""
+    gaps = []
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    s._dirty = True
+    start = time.perf_counter()
+    await s._tick(0, 30, 0)
+    took = time.perf_counter() - start
+    done.set()
+    await task
+    return max(gaps), took
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    cases = {c.case_number: c for c in map(Case, range(max(1, n // 10)))}
+    numbers = list(cases)
+    path = os.path.join(tempfile.mkdtemp(prefix="justia-bench-"), "reminders.bin")
+    s = ReminderScheduler(cases.get, NullSink(), path=path)
+    offsets = [168, 24, 2]
+    print(f"{n:,} subscriptions × {len(offsets)} offsets over {len(cases):,} cases")
+
+    timed("subscribe", n, lambda: [s.subscribe(f"user{i}", numbers[i % len(numbers)], offsets) for i in range(n)])
+    data = timed("snapshot()", n, s.snapshot)
+    print(f"  snapshot size {len(data) / 2**20:.1f}MB ({len(data) / n:.0f} bytes/subscription)")
+    s.save()
+    restored = ReminderScheduler(cases.get, NullSink(), path=path)
+    timed("load()", n, restored.load)
+    lookups = 10_000
+    timed(f"for_user() x{lookups:,}", lookups, lambda: [s.for_user(f"user{i}") for i in range(lookups)])
+    stall, took = asyncio.run(persist_stall(s))
+    print(f"  persist from _tick: {took * 1000:,.0f}ms, longest loop stall {stall * 1000:.1f}ms")
+
+    # jump past every hearing and drain the heap through the real dispatch loop
+    pending = len(s._heap)
+    later = time.time() + 400 * 86400
+    reminders.time.time = lambda: later
+    s.path = None                                           # no snapshot write inside the timing
+    timed("dispatch (_tick, null sink)", pending, lambda: asyncio.run(s._tick(0, 30, time.monotonic())))
+    assert s.dispatched == pending and not s.subs
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+user-032: BM25 query latency, and what top-k grounding adds to each chat prompt.
+
+    python bench/bench_search.py [iterations]
+
+Token counts are estimated at ~4 characters per token. "before" is the full prompt
+(system prompt, build_context_prompt, message) as it was before grounding, with the
+state header and act names only. "after" adds the top-4 RELEVANT LEGAL FACTS. "all
+facts" shows what grounding with every fact of the case type would add instead.
+Grounding costs input tokens on every turn. Any saving is in output tokens the model
+no longer spends restating those facts, which needs a live model to measure and
+is not measured here.
+"""
+import statistics
+import sys
+import time
+
+import _path  # noqa: F401
+import main as app
+from search import get_index
+
+QUERIES = [
+    ("rental_deposit", "landlord is not returning my security deposit"),
+    ("rental_deposit", "how many days does the owner have to refund the deposit"),
+    ("rental_deposit", "किराया जमा वापस नहीं किया"),
+    ("labour_wage", "employer has not paid my salary for three months"),
+    ("labour_wage", "ஊதியம் கொடுக்கவில்லை"),
+    ("consumer_complaint", "defective product and the seller refuses a refund"),
+    ("consumer_complaint", "ఉత్పత్తి ఫిర్యాదు"),
+    ("domestic_violence", "my husband beats me, how do I get a protection order"),
+    ("domestic_violence", "স্বামী নির্যাতন"),
+]
+
+
+def tokens(texts) -> int:
+    return sum(len(t) for t in texts) // 4
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    start = time.perf_counter()
+    index = get_index()
+    print(f"index: {len(index.snippets)} snippets, {len(index.postings)} terms, "
+          f"built in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    latencies = []
+    for _ in range(iterations // len(QUERIES)):
+        for _, query in QUERIES:
+            t = time.perf_counter()
+            index.search(query, k=4)
+            latencies.append(time.perf_counter() - t)
+    print(f"query latency: p50 {statistics.median(latencies) * 1e6:.0f}µs  "
+          f"p99 {statistics.quantiles(latencies, n=100)[98] * 1e6:.0f}µs  ({len(latencies)} queries)")
+
+    grounded = app.relevant_snippets
+
+    def prompt(query: str, snippets) -> int:
+        app.relevant_snippets = snippets
+        try:
+            req = app.ChatRequest(message=query, state="karnataka")
+            return tokens([app.JUSTIA_SYSTEM_PROMPT, app.build_context_prompt(req), query])
+        finally:
+            app.relevant_snippets = grounded
+
+    print("\nest. input tokens per turn (state: Karnataka, no case type selected)")
+    print(f"{'query':52}{'before':>8}{'after':>7}{'added':>7}{'all facts':>11}")
+    totals = [0, 0, 0]
+    for case_type, query in QUERIES:
+        every = [s["text"] for s in index.snippets if s["case_type"] == case_type]
+        before = prompt(query, lambda *a, **k: [])
+        after = prompt(query, grounded)
+        everything = prompt(query, lambda *a, **k: every)
+        for i, n in enumerate((before, after, everything)):
+            totals[i] += n
+        print(f"{query[:50]:52}{before:>8}{after:>7}{after - before:>+7}{everything - before:>+11}")
+    before, after, everything = totals
+    print(f"{'total':52}{before:>8}{after:>7}{after - before:>+7}{everything - before:>+11}"
+          f"   (+{after / before - 1:.0%} input tokens; all facts would be +{everything / before - 1:.0%})")
+
+
+if __name__ == "__main__":
+    main()
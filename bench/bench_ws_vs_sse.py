@@ -0,0 +1,130 @@
+"""
+user-037: per-turn latency and server CPU, WebSocket (/ws/chat) vs SSE (/api/chat/stream).
+
+    python bench/bench_ws_vs_sse.py [--connections 1000] [--turns 5]
+
+Starts one uvicorn worker in mock mode, holds `connections` clients open at once
+and has each run `turns` sequential chat turns: over one WebSocket (history kept
+server-side) or as keep-alive POSTs to the SSE endpoint (history re-sent each turn).
+Server CPU is read from /proc/<pid>/stat. Replies stream at the mock's pace (one
+character per --char-delay-ms, default 10ms, roughly a live model's token rate).
+10k connections needs `ulimit -n` > 20k and is usually bound by this single-process
+client; compare the CPU/turn column. The server runs like serve.py: permessage-deflate
+off unless --deflate (JUSTIA_WS_COALESCE_MS sets the delta coalescing window).
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+import websockets
+
+from _path import ROOT
+
+MESSAGE = "My landlord has not returned my security deposit"
+SERVER = """
+import _path, main, uvicorn
+main.stream_reply.__defaults__ = ({delay},)
+uvicorn.run(main.app, host="127.0.0.1", port={port}, log_level="warning", backlog=65535, ws_max_size=1 << 20,
+            ws_per_message_deflate={deflate})
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def ws_client(port: int, turns: int, latencies: list):
+    async with websockets.connect(f"ws://127.0.0.1:{port}/ws/chat", max_size=None, open_timeout=60) as ws:
+        session = {}
+        for _ in range(turns):
+            start = time.perf_counter()
+            await ws.send(json.dumps({"type": "chat", "message": MESSAGE, "state": "karnataka", **session}))
+            while True:
+                frame = json.loads(await ws.recv())
+                if frame["type"] == "start" and not session:
+                    session = {"session_id": frame["session_id"], "resume_token": frame["resume_token"]}
+                elif frame["type"] == "ping":
+                    await ws.send('{"type": "pong"}')
+                elif frame["type"] in ("done", "error"):
+                    break
+            latencies.append(time.perf_counter() - start)
+
+
+async def sse_client(client: httpx.AsyncClient, port: int, turns: int, latencies: list):
+    history = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        body = {"message": MESSAGE, "state": "karnataka", "conversation_history": history}
+        reply = []
+        async with client.stream("POST", f"http://127.0.0.1:{port}/api/chat/stream", json=body) as resp:
+            async for line in resp.aiter_lines():
+                if line == "data: [DONE]":
+                    break
+                if line.startswith("data: "):
+                    reply.append(line[6:])
+        history = history + [{"role": "user", "content": MESSAGE}, {"role": "assistant", "content": "".join(reply)}]
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(kind: str, port: int, connections: int, turns: int) -> list:
+    latencies = []
+    if kind == "ws":
+        await asyncio.gather(*(ws_client(port, turns, latencies) for _ in range(connections)))
+    else:
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+            await asyncio.gather(*(sse_client(client, port, turns, latencies) for _ in range(connections)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--char-delay-ms", type=float, default=10.0)
+    parser.add_argument("--deflate", action="store_true")
+    args = parser.parse_args()
+
+    port = free_port()
+    env = {k: v for k, v in os.environ.items() if k != "ANTHROPIC_API_KEY"}
+    env.update(JUSTIA_AUDIT="off", PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    code = SERVER.format(port=port, delay=args.char_delay_ms / 1000, deflate=args.deflate)
+    server = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=env)
+    try:
+        for _ in range(300):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        print(f"{args.connections:,} concurrent connections × {args.turns} turns each")
+        print(f"{'':6}{'wall':>9}{'turns/s':>10}{'p50':>9}{'p99':>9}{'server CPU/turn':>18}")
+        for kind in ("ws", "sse"):
+            cpu, start = cpu_seconds(server.pid), time.perf_counter()
+            latencies = asyncio.run(run(kind, port, args.connections, args.turns))
+            wall, cpu = time.perf_counter() - start, cpu_seconds(server.pid) - cpu
+            q = statistics.quantiles(latencies, n=100)
+            print(f"{kind:6}{wall:>8.1f}s{len(latencies) / wall:>10,.0f}{q[49] * 1000:>7.0f}ms{q[98] * 1000:>7.0f}ms"
+                  f"{cpu / len(latencies) * 1000:>16.2f}ms")
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Offline data bundle with binary deltas
+#  STATES, CASE_TYPES, NGOs and mock responses in one content-
+#  hashed, compressed file; clients holding an older version get
+#  a COPY/INSERT delta against it instead of the whole thing
+# ═══════════════════════════════════════════════════════════════
+
+import os
+import gzip
+import json
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from data.legal_data import STATES, CASE_TYPES, MOCK_RESPONSES
+from records import legal_records
+
+DELTA_MAGIC = b"JDL1"
+_COPY, _INSERT = 1, 2
+
+
+# ── DELTA ENCODING ───────────────────────────────────────────────
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple:
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return n, pos
+        shift += 7
+
+
+def make_delta(old: bytes, new: bytes, block: int = 32) -> bytes:
+    """
+    Ops: COPY(offset, length) from `old`, INSERT(length, bytes). Matches are
+    found via a hash of `old`'s aligned blocks and extended in both directions.
+    Output is zlib-compressed; apply with apply_delta().
+    """
+    index = {}
+    for i in range(0, len(old) - block + 1, block):
+        index.setdefault(old[i:i + block], i)
+
+    ops = bytearray()
+    literal_start = pos = 0
+
+    def flush_literal(end):
+        if end > literal_start:
+            ops.append(_INSERT)
+            ops.extend(_varint(end - literal_start))
+            ops.extend(new[literal_start:end])
+
+    while pos + block <= len(new):
+        src = index.get(new[pos:pos + block])
+        if src is None:
+            pos += 1
+            continue
+        start, src_start = pos, src
+        while start > literal_start and src_start > 0 and new[start - 1] == old[src_start - 1]:
+            start -= 1
+            src_start -= 1
+        end, src_end = pos + block, src + block
+        while end < len(new) and src_end < len(old) and new[end] == old[src_end]:
+            end += 1
+            src_end += 1
+        flush_literal(start)
+        ops.append(_COPY)
+        ops.extend(_varint(src_start))
+        ops.extend(_varint(end - start))
+        literal_start = pos = end
+    flush_literal(len(new))
+    return DELTA_MAGIC + zlib.compress(bytes(ops), 9)
+
+
+def apply_delta(old: bytes, delta: bytes) -> bytes:
+    """Reference decoder (the web client implements the same few lines)."""
+    if not delta.startswith(DELTA_MAGIC):
+        raise ValueError("Not a JUSTIA delta")
+    ops = zlib.decompress(delta[len(DELTA_MAGIC):])
+    out = bytearray()
+    pos = 0
+    while pos < len(ops):
+        op = ops[pos]
+        pos += 1
+        if op == _COPY:
+            offset, pos = _read_varint(ops, pos)
+            length, pos = _read_varint(ops, pos)
+            out.extend(old[offset:offset + length])
+        elif op == _INSERT:
+            length, pos = _read_varint(ops, pos)
+            out.extend(ops[pos:pos + length])
+            pos += length
+        else:
+            raise ValueError(f"Bad delta op {op}")
+    return bytes(out)
+
+
+# ── BUNDLES ──────────────────────────────────────────────────────
+def build_bundle(languages: tuple) -> bytes:
+    """Canonical JSON (sorted keys, no whitespace) so equal data ⇒ equal hash."""
+    payload = {
+        "languages": list(languages),
+        "states": STATES,
+        "case_types": CASE_TYPES,
+        "ngos": [ngo.as_dict() for ngo in legal_records()[1]],
+        "mock_responses": {
+            stage: {lang: text for lang, text in texts.items() if lang in languages}
+            for stage, texts in MOCK_RESPONSES.items()
+        },
+    }
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def bundle_version(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+class BundleStore:
+    """
+    Builds each bundle once per (data version, language set) and keeps every
+    version it has served, in memory and optionally on disk (JUSTIA_BUNDLE_DIR),
+    so clients on a previous deploy's bundle can still be sent a delta.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_deltas: int = 256):
+        self.directory = directory
+        self._current: dict = {}            # languages → (version, raw, gzipped)
+        self._raw: dict = {}                # version → raw JSON
+        self._deltas: OrderedDict = OrderedDict()
+        self._max_deltas = max_deltas
+        self._lock = threading.Lock()
+        self.full_sent = 0
+        self.delta_sent = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def current(self, languages: tuple) -> tuple:
+        with self._lock:
+            if languages not in self._current:
+                raw = build_bundle(languages)
+                version = bundle_version(raw)
+                self._current[languages] = (version, raw, gzip.compress(raw, 9, mtime=0))
+                self._remember(version, raw)
+            return self._current[languages]
+
+    def _remember(self, version: str, raw: bytes):
+        self._raw[version] = raw
+        if self.directory:
+            path = os.path.join(self.directory, f"{version}.json.gz")
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(gzip.compress(raw, 9, mtime=0))
+
+    def _old(self, version: str) -> Optional[bytes]:
+        if version in self._raw:
+            return self._raw[version]
+        if self.directory and all(c in "0123456789abcdef" for c in version):
+            path = os.path.join(self.directory, f"{version}.json.gz")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    raw = gzip.decompress(f.read())
+                self._raw[version] = raw
+                return raw
+        return None
+
+    def delta(self, have: str, version: str, raw: bytes) -> Optional[bytes]:
+        key = (have, version)
+        with self._lock:
+            if key in self._deltas:
+                self._deltas.move_to_end(key)
+                return self._deltas[key]
+            old = self._old(have)
+            if old is None:
+                return None
+            patch = make_delta(old, raw)
+            self._deltas[key] = patch
+            if len(self._deltas) > self._max_deltas:
+                self._deltas.popitem(last=False)
+            return patch
+
+    def record(self, kind: str, sent: int, full_size: int):
+        with self._lock:
+            if kind == "full":
+                self.full_sent += 1
+            elif kind == "delta":
+                self.delta_sent += 1
+            else:
+                self.not_modified += 1
+            self.bytes_sent += sent
+            self.bytes_saved += full_size - sent
+
+    def stats(self) -> dict:
+        served = self.full_sent + self.delta_sent + self.not_modified
+        return {
+            "versions_cached": len(self._raw),
+            "full": self.full_sent,
+            "delta": self.delta_sent,
+            "not_modified": self.not_modified,
+            "bytes_sent": self.bytes_sent,
+            "bytes_saved": self.bytes_saved,
+            "avg_bytes_saved_per_client": round(self.bytes_saved / served) if served else None,
+        }
@@ -0,0 +1,193 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Cache tier
+#  Per-process TTL/LRU cache, or a shared store served over a local
+#  Unix socket when running under the multi-worker launcher (serve.py)
+# ═══════════════════════════════════════════════════════════════
+
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.managers import BaseManager
+from typing import Any, Optional
+
+
+# ── STORE (lives in one process) ─────────────────────────────────
+class _Store:
+    """TTL + LRU dict. Each entry remembers which worker wrote it."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at, writer_pid = entry
+            if expires_at and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value, writer_pid
+
+    def set(self, key: str, value: Any, ttl: float, writer_pid: int):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else 0, writer_pid)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class CacheManager(BaseManager):
+    pass
+
+
+_server_store = None
+
+
+def _shared_store():
+    global _server_store
+    if _server_store is None:
+        _server_store = _Store(int(os.getenv("JUSTIA_CACHE_MAX_ENTRIES", "100000")))
+    return _server_store
+
+
+CacheManager.register("store", callable=_shared_store)
+
+
+def run_cache_server(address: str, authkey: bytes):
+    """Serves the shared store forever. serve.py runs this in its own process before forking workers."""
+    CacheManager(address=address, authkey=authkey).get_server().serve_forever()
+
+
+# ── CLIENT-SIDE CACHE ────────────────────────────────────────────
+_io_pool: Optional[ThreadPoolExecutor] = None
+_io_pool_pid: Optional[int] = None
+
+
+def _shared_io_pool() -> ThreadPoolExecutor:
+    # Shared-store round trips from coroutines run here, never on the event loop.
+    # Its own pool, so a hung cache server can't starve asyncio.to_thread users.
+    global _io_pool, _io_pool_pid
+    if _io_pool is None or _io_pool_pid != os.getpid():
+        _io_pool = ThreadPoolExecutor(int(os.getenv("JUSTIA_CACHE_IO_THREADS", "8")), thread_name_prefix="cache")
+        _io_pool_pid = os.getpid()
+    return _io_pool
+
+
+class Cache:
+    """
+    Namespaced cache. Uses the shared store when JUSTIA_CACHE_ADDR is set
+    (multi-worker mode), otherwise an in-process store. If the shared store
+    becomes unreachable, the worker degrades to its local store.
+
+    get()/set() block on the shared store's socket; coroutines use aget()/aset(),
+    which run the round trip on a small thread pool and give up after timeout_s
+    (a read that times out is a miss, a write that times out is dropped).
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_local_entries: int = 10000,
+                 timeout_s: Optional[float] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.timeout_s = timeout_s if timeout_s is not None else float(os.getenv("JUSTIA_CACHE_TIMEOUT_S", "0.1"))
+        self.hits = 0
+        self.cross_worker_hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self._local = _Store(max_local_entries)
+        self._remote = None
+        self._remote_pid = None
+
+    def _store(self):
+        addr = os.getenv("JUSTIA_CACHE_ADDR")
+        if not addr:
+            return self._local
+        # proxies must not cross fork(); reconnect once per worker process
+        if self._remote is None or self._remote_pid != os.getpid():
+            try:
+                manager = CacheManager(address=addr, authkey=bytes.fromhex(os.getenv("JUSTIA_CACHE_AUTHKEY", "")))
+                manager.connect()
+                self._remote = manager.store()
+                self._remote_pid = os.getpid()
+            except Exception as e:
+                print(f"Shared cache unavailable, using local cache: {e}")
+                return self._local
+        return self._remote
+
+    def get(self, key: str) -> Any:
+        try:
+            found = self._store().get(f"{self.namespace}:{key}")
+        except Exception as e:
+            print(f"Shared cache read failed: {e}")
+            self._remote = None
+            found = None
+        if found is None:
+            self.misses += 1
+            return None
+        value, writer_pid = found
+        self.hits += 1
+        if writer_pid != os.getpid():
+            self.cross_worker_hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        try:
+            self._store().set(f"{self.namespace}:{key}", value, self.ttl if ttl is None else ttl, os.getpid())
+        except Exception as e:
+            print(f"Shared cache write failed: {e}")
+            self._remote = None
+
+    async def _off_loop(self, fn, *args):
+        future = asyncio.wrap_future(_shared_io_pool().submit(fn, *args))
+        try:
+            return await asyncio.wait_for(future, self.timeout_s)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"Shared cache call timed out after {self.timeout_s}s")
+            return None
+
+    async def aget(self, key: str) -> Any:
+        if not os.getenv("JUSTIA_CACHE_ADDR"):
+            return self.get(key)        # local store: a dict lookup, fine on the loop
+        return await self._off_loop(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        if not os.getenv("JUSTIA_CACHE_ADDR"):
+            self.set(key, value, ttl)
+            return
+        await self._off_loop(self.set, key, value, ttl)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "tier": "shared" if os.getenv("JUSTIA_CACHE_ADDR") else "local",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "cross_worker_hits": self.cross_worker_hits,
+            "cross_worker_hit_rate": round(self.cross_worker_hits / lookups, 3) if lookups else None,
+            "timeouts": self.timeouts,
+        }
+
+
+def worker_rss_mb() -> Optional[float]:
+    """Current resident set size of this process (Linux /proc), in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,225 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Deposit refund interest & limitation calculator
+#  Deterministic maths from CASE_TYPES["rental_deposit"], so the
+#  LLM never has to do arithmetic on dates or money
+# ═══════════════════════════════════════════════════════════════
+
+import math
+from datetime import date, timedelta
+from typing import Optional
+
+from data.legal_data import CASE_TYPES
+
+RENTAL = CASE_TYPES["rental_deposit"]
+RULES = RENTAL["deposit_rules"]
+LIMITATION_YEARS = RENTAL["limitation_period_years"]
+
+
+def _add_years(d: date, years: int) -> date:
+    try:
+        return d.replace(year=d.year + years)
+    except ValueError:  # 29 Feb → 28 Feb
+        return d.replace(year=d.year + years, day=28)
+
+
+def _finite(name: str, value: Optional[float]):
+    # inf/nan would reach the JSON encoder as a 500
+    if value is not None and not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number")
+
+
+def _paise(amount: float) -> float:
+    # half-up to 2 places with plain float ops, so the NumPy path gets bit-identical results
+    return math.floor(amount * 100 + 0.5) / 100
+
+
+# ── SINGLE TENANCY ───────────────────────────────────────────────
+def deposit_claim(deposit_amount: float, vacated_on: date, refunded_on: Optional[date] = None,
+                  amount_refunded: float = 0.0, monthly_rent: Optional[float] = None,
+                  as_of: Optional[date] = None) -> dict:
+    """
+    Interest owed on a delayed deposit refund and the deadline to file.
+    Interest runs from the statutory return date until the refund (or as_of).
+    """
+    for name, value in (("deposit_amount", deposit_amount), ("amount_refunded", amount_refunded),
+                        ("monthly_rent", monthly_rent)):
+        _finite(name, value)
+    if deposit_amount <= 0:
+        raise ValueError("deposit_amount must be positive")
+    as_of = as_of or date.today()
+    due = vacated_on + timedelta(days=RULES["return_days"])
+    stop = min(refunded_on, as_of) if refunded_on else as_of
+    days_late = max(0, (stop - due).days)
+    outstanding = max(0.0, deposit_amount - amount_refunded)
+    interest = _paise(outstanding * RULES["interest_rate_percent"] / 100 * days_late / 365)
+    deadline = _add_years(due, LIMITATION_YEARS)
+    return {
+        "due_date": due.isoformat(),
+        "days_late": days_late,
+        "outstanding": _paise(outstanding),
+        "interest": interest,
+        "total_owed": _paise(outstanding + interest),
+        "filing_deadline": deadline.isoformat(),
+        "days_remaining": (deadline - as_of).days,
+        "time_barred": deadline < as_of,
+        "deposit_cap_exceeded": (
+            deposit_amount > monthly_rent * RULES["residential_max_months"] if monthly_rent else None
+        ),
+    }
+
+
+# ── BULK (vectorised) ────────────────────────────────────────────
+_EPOCH = date(1970, 1, 1).toordinal()
+_NAT = -(2 ** 63)                   # int64 view of numpy's NaT
+
+
+def _bulk_number(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise TypeError
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError
+    return number
+
+
+def _bulk_day(value) -> int:
+    # ISO strings or date objects only; a bare number is not a date
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    elif not isinstance(value, date):
+        raise TypeError
+    return value.toordinal() - _EPOCH
+
+
+_BULK_FIELDS = (            # key, parser, value when absent
+    ("deposit_amount", _bulk_number, math.nan),
+    ("vacated_on", _bulk_day, _NAT),
+    ("refunded_on", _bulk_day, _NAT),
+    ("amount_refunded", _bulk_number, 0.0),
+    ("monthly_rent", _bulk_number, math.nan),
+)
+
+
+def _bulk_columns(records: list) -> tuple:
+    """One list per _BULK_FIELDS entry, plus a per-row error (None if the row parsed)."""
+    errors = [None] * len(records)
+    columns = []
+    for key, parse, absent in _BULK_FIELDS:
+        column = []
+        for i, r in enumerate(records):
+            value = r.get(key)
+            if value is None:
+                column.append(absent)
+                continue
+            try:
+                column.append(parse(value))
+            except (TypeError, ValueError, OverflowError):
+                column.append(absent)
+                if errors[i] is None:
+                    errors[i] = f"Invalid {key}: {value!r}"
+        columns.append(column)
+    return columns, errors
+
+
+def deposit_claims_bulk(records: list, as_of: Optional[date] = None) -> list:
+    """
+    Same maths as deposit_claim() over many tenancies at once, using NumPy
+    datetime64/float arrays. Each record needs deposit_amount and vacated_on;
+    refunded_on, amount_refunded and monthly_rent are optional. Amounts must be finite
+    numbers and dates ISO strings (or dates); a row that fails gets an "error" in place.
+    """
+    if not records:
+        return []
+    import numpy as np      # bulk endpoint only; keeps numpy out of app start-up
+    as_of = np.datetime64(as_of or date.today(), "D")
+    (deposit, vacated, refunded, paid_back, rent), errors = _bulk_columns(records)
+    deposit = np.asarray(deposit, dtype=np.float64)
+    vacated = np.asarray(vacated, dtype=np.int64).view("datetime64[D]")
+    refunded = np.asarray(refunded, dtype=np.int64).view("datetime64[D]")
+    paid_back = np.asarray(paid_back, dtype=np.float64)
+    rent = np.asarray(rent, dtype=np.float64)
+
+    valid = ~np.isnan(deposit) & (deposit > 0) & ~np.isnat(vacated)
+    due = vacated + np.timedelta64(RULES["return_days"], "D")
+    stop = np.where(np.isnat(refunded), as_of, np.minimum(refunded, as_of))
+    days_late = np.maximum(0, (stop - due).astype(np.int64))
+    outstanding = np.maximum(0.0, deposit - paid_back)
+    # same operations, in the same order, as deposit_claim() and _paise()
+    interest = np.floor(outstanding * RULES["interest_rate_percent"] / 100 * days_late / 365 * 100 + 0.5) / 100
+    total = np.floor((outstanding + interest) * 100 + 0.5) / 100
+    outstanding = np.floor(outstanding * 100 + 0.5) / 100
+
+    # due + N years, clamping 29 Feb to 28 Feb like deposit_claim()
+    due_month = due.astype("datetime64[M]")
+    day = (due - due_month.astype("datetime64[D]")).astype(np.int64)
+    target = due_month + np.timedelta64(12 * LIMITATION_YEARS, "M")
+    month_len = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(np.int64)
+    deadline = target.astype("datetime64[D]") + np.minimum(day, month_len - 1)
+    days_remaining = (deadline - as_of).astype(np.int64)
+
+    cap_exceeded = deposit > rent * RULES["residential_max_months"]
+    has_rent = ~np.isnan(rent)
+
+    columns = zip(
+        errors, valid.tolist(), due.astype(str).tolist(), days_late.tolist(),
+        outstanding.tolist(), interest.tolist(), total.tolist(),
+        deadline.astype(str).tolist(), days_remaining.tolist(),
+        has_rent.tolist(), cap_exceeded.tolist(),
+    )
+    results = []
+    for error, ok, d, late, out, intr, total, dl, rem, rent_known, cap in columns:
+        if error is not None:
+            results.append({"error": error})
+            continue
+        if not ok:
+            results.append({"error": "deposit_amount (> 0) and vacated_on are required"})
+            continue
+        results.append({
+            "due_date": d,
+            "days_late": late,
+            "outstanding": out,
+            "interest": intr,
+            "total_owed": total,
+            "filing_deadline": dl,
+            "days_remaining": rem,
+            "time_barred": rem < 0,
+            "deposit_cap_exceeded": cap if rent_known else None,
+        })
+    return results
+
+
+# ── CLAUDE TOOL ──────────────────────────────────────────────────
+DEPOSIT_TOOL = {
+    "name": "calculate_deposit_claim",
+    "description": (
+        "Computes the interest a landlord owes on a delayed security deposit refund under the "
+        "Model Tenancy Act rules, the last date to file a claim, and the days remaining. "
+        "Use this instead of doing date or money arithmetic yourself."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "deposit_amount": {"type": "number", "description": "Security deposit paid, in rupees"},
+            "vacated_on": {"type": "string", "description": "Date the tenant vacated, YYYY-MM-DD"},
+            "refunded_on": {"type": "string", "description": "Date the deposit was refunded, if it was"},
+            "amount_refunded": {"type": "number", "description": "Amount already refunded, in rupees"},
+            "monthly_rent": {"type": "number", "description": "Monthly rent, to check the deposit cap"},
+        },
+        "required": ["deposit_amount", "vacated_on"],
+    },
+}
+
+
+def run_tool(name: str, args: dict) -> dict:
+    if name != DEPOSIT_TOOL["name"]:
+        return {"error": f"Unknown tool '{name}'"}
+    try:
+        return deposit_claim(
+            float(args["deposit_amount"]),
+            date.fromisoformat(args["vacated_on"]),
+            date.fromisoformat(args["refunded_on"]) if args.get("refunded_on") else None,
+            float(args.get("amount_refunded") or 0),
+            float(args["monthly_rent"]) if args.get("monthly_rent") else None,
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return {"error": str(e)}
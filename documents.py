@@ -0,0 +1,352 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Legal notice / complaint generator
+#  Templates are compiled once per (case_type, state, language):
+#  state and case-type facts are baked in, only user facts remain
+# ═══════════════════════════════════════════════════════════════
+
+import io
+import html
+import zipfile
+import threading
+import multiprocessing
+from datetime import date
+from string import Template
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from data.legal_data import STATES, CASE_TYPES
+
+
+class DocumentError(ValueError):
+    """Bad input for a document (unknown combination or missing facts)."""
+
+
+# ── TEMPLATE SOURCES ─────────────────────────────────────────────
+# $name placeholders: state/case-type keys are filled at compile time,
+# everything in "facts" is filled per document.
+DOCUMENTS = {
+    "rental_deposit": {
+        "facts": ["tenant_name", "tenant_address", "landlord_name", "landlord_address",
+                  "property_address", "deposit_amount", "vacated_on"],
+        "en": {
+            "title": "LEGAL NOTICE — DEMAND FOR REFUND OF SECURITY DEPOSIT",
+            "body": [
+                "Date: $date",
+                "From: $tenant_name, $tenant_address",
+                "To: $landlord_name, $landlord_address",
+                "Subject: Refund of security deposit of Rs. $deposit_amount for the premises at $property_address",
+                "1. I was your tenant at $property_address and vacated the premises on $vacated_on. "
+                "At the start of the tenancy I paid you a security deposit of Rs. $deposit_amount.",
+                "2. Under the $primary_acts and the $rent_act, the security deposit must be refunded "
+                "within $return_days days of the tenant vacating, less lawful deductions. "
+                "No deductions have been communicated to me.",
+                "3. I call upon you to refund Rs. $deposit_amount within 15 days of receiving this notice, "
+                "with interest at $interest_rate% per annum from the date it fell due.",
+                "4. If you fail to do so, I will approach the appropriate forum, including the "
+                "$consumer_forum or the civil court, at your risk as to costs.",
+                "Sincerely,",
+                "$tenant_name",
+            ],
+        },
+        "hi": {
+            "title": "कानूनी नोटिस — सुरक्षा जमा राशि वापसी की मांग",
+            "body": [
+                "दिनांक: $date",
+                "प्रेषक: $tenant_name, $tenant_address",
+                "प्रति: $landlord_name, $landlord_address",
+                "विषय: $property_address परिसर की सुरक्षा जमा राशि ₹$deposit_amount की वापसी",
+                "1. मैं $property_address में आपका किरायेदार था/थी और मैंने $vacated_on को परिसर खाली किया। "
+                "किरायेदारी की शुरुआत में मैंने आपको ₹$deposit_amount सुरक्षा जमा के रूप में दिए थे।",
+                "2. $primary_acts तथा $rent_act के अनुसार, किरायेदार के परिसर खाली करने के $return_days दिनों "
+                "के भीतर जमा राशि वापस करनी होती है। मुझे किसी कटौती की सूचना नहीं दी गई है।",
+                "3. आपसे अनुरोध है कि इस नोटिस की प्राप्ति के 15 दिनों के भीतर ₹$deposit_amount, देय तिथि से "
+                "$interest_rate% वार्षिक ब्याज सहित, वापस करें।",
+                "4. ऐसा न करने पर मैं $consumer_forum या सिविल न्यायालय में कार्यवाही करूँगा/करूँगी, "
+                "जिसका खर्च आपको वहन करना होगा।",
+                "भवदीय,",
+                "$tenant_name",
+            ],
+        },
+    },
+    "labour_wage": {
+        "facts": ["employee_name", "employee_address", "employer_name", "employer_address",
+                  "amount_due", "period"],
+        "en": {
+            "title": "LEGAL NOTICE — DEMAND FOR PAYMENT OF UNPAID WAGES",
+            "body": [
+                "Date: $date",
+                "From: $employee_name, $employee_address",
+                "To: $employer_name, $employer_address",
+                "Subject: Unpaid wages of Rs. $amount_due for $period",
+                "1. I was employed by you and have not been paid wages of Rs. $amount_due for $period.",
+                "2. Under the $primary_acts, wages must be paid on time and no deduction may be made "
+                "without a lawful reason communicated in writing.",
+                "3. I call upon you to pay Rs. $amount_due within 15 days of receiving this notice.",
+                "4. If you fail to do so, I will file a complaint with the $labour_commissioner "
+                "and pursue all remedies available under law.",
+                "Sincerely,",
+                "$employee_name",
+            ],
+        },
+        "hi": {
+            "title": "कानूनी नोटिस — बकाया वेतन भुगतान की मांग",
+            "body": [
+                "दिनांक: $date",
+                "प्रेषक: $employee_name, $employee_address",
+                "प्रति: $employer_name, $employer_address",
+                "विषय: $period का बकाया वेतन ₹$amount_due",
+                "1. मैं आपके यहाँ कार्यरत था/थी और मुझे $period का ₹$amount_due वेतन नहीं मिला है।",
+                "2. $primary_acts के अनुसार वेतन समय पर देना अनिवार्य है और बिना लिखित वैध कारण कोई कटौती नहीं की जा सकती।",
+                "3. आपसे अनुरोध है कि इस नोटिस की प्राप्ति के 15 दिनों के भीतर ₹$amount_due का भुगतान करें।",
+                "4. ऐसा न करने पर मैं $labour_commissioner के समक्ष शिकायत दर्ज करूँगा/करूँगी।",
+                "भवदीय,",
+                "$employee_name",
+            ],
+        },
+    },
+    "consumer_complaint": {
+        "facts": ["complainant_name", "complainant_address", "opposite_party", "opposite_party_address",
+                  "product", "purchase_date", "amount", "defect"],
+        "en": {
+            "title": "CONSUMER COMPLAINT",
+            "body": [
+                "Before the District Consumer Disputes Redressal Commission",
+                "(appeals lie to the $consumer_forum)",
+                "Date: $date",
+                "Complainant: $complainant_name, $complainant_address",
+                "Opposite Party: $opposite_party, $opposite_party_address",
+                "Complaint under the $primary_acts",
+                "1. On $purchase_date the complainant bought $product from the opposite party for Rs. $amount.",
+                "2. Deficiency: $defect",
+                "3. The complainant asked the opposite party to remedy this, but it has not done so. "
+                "This is a deficiency in service and an unfair trade practice.",
+                "4. The complainant prays for a refund of Rs. $amount with interest, compensation for "
+                "mental agony, and the costs of this complaint.",
+                "Complainant",
+                "$complainant_name",
+            ],
+        },
+        "hi": {
+            "title": "उपभोक्ता शिकायत",
+            "body": [
+                "जिला उपभोक्ता विवाद प्रतितोष आयोग के समक्ष",
+                "(अपील: $consumer_forum)",
+                "दिनांक: $date",
+                "शिकायतकर्ता: $complainant_name, $complainant_address",
+                "विपक्षी पक्ष: $opposite_party, $opposite_party_address",
+                "$primary_acts के अंतर्गत शिकायत",
+                "1. शिकायतकर्ता ने $purchase_date को विपक्षी पक्ष से ₹$amount में $product खरीदा।",
+                "2. कमी: $defect",
+                "3. शिकायतकर्ता के अनुरोध के बावजूद विपक्षी पक्ष ने समाधान नहीं किया। यह सेवा में कमी और अनुचित व्यापार प्रथा है।",
+                "4. शिकायतकर्ता ₹$amount की ब्याज सहित वापसी, मानसिक पीड़ा का मुआवज़ा और शिकायत का खर्च चाहता/चाहती है।",
+                "शिकायतकर्ता",
+                "$complainant_name",
+            ],
+        },
+    },
+}
+
+AMOUNT_FACTS = {"deposit_amount", "amount_due", "amount"}
+FOOTER = "Prepared with JUSTIA. This is legal information, not legal advice."
+
+
+# ── COMPILATION ──────────────────────────────────────────────────
+class CompiledDocument:
+    __slots__ = ("title", "body", "facts")
+
+    def __init__(self, title: str, body: list, facts: list):
+        self.title = title
+        self.body = tuple(Template(p) for p in body)
+        self.facts = tuple(facts)
+
+    def render_text(self, facts: dict) -> list:
+        missing = [f for f in self.facts if not facts.get(f)]
+        if missing:
+            raise DocumentError(f"Missing facts: {', '.join(missing)}")
+        values = {"date": facts.get("date") or date.today().isoformat()}
+        for key in self.facts:
+            value = facts[key]
+            if key in AMOUNT_FACTS:
+                try:
+                    value = f"{float(value):,.0f}"
+                except (TypeError, ValueError):
+                    raise DocumentError(f"'{key}' must be a number")
+            values[key] = str(value)
+        return [self.title] + [p.substitute(values) for p in self.body]
+
+
+def _static_values(case_type: str, state: str) -> dict:
+    st, ct = STATES[state], CASE_TYPES[case_type]
+    rules = ct.get("deposit_rules", {})
+    values = {
+        "primary_acts": "; ".join(ct["primary_acts"]),
+        "rent_act": st["rent_act"],
+        "consumer_forum": st["consumer_forum"],
+        "labour_commissioner": st["labour_commissioner"],
+        "return_days": rules.get("return_days", ""),
+        "interest_rate": rules.get("interest_rate_percent", ""),
+    }
+    # escape "$" so static text can't introduce placeholders
+    return {k: str(v).replace("$", "$$") for k, v in values.items()}
+
+
+def document_language(case_type: str, language: str) -> str:
+    """Language the document will actually be rendered in (English if no template exists)."""
+    return language if language in DOCUMENTS.get(case_type, {}) else "en"
+
+
+@lru_cache(maxsize=None)
+def compile_document(case_type: str, state: str, language: str) -> CompiledDocument:
+    if case_type not in DOCUMENTS:
+        raise DocumentError(f"No document template for case type '{case_type}'")
+    if state not in STATES:
+        raise DocumentError(f"State '{state}' not found")
+    spec = DOCUMENTS[case_type]
+    source = spec[document_language(case_type, language)]
+    static = _static_values(case_type, state)
+    return CompiledDocument(
+        Template(source["title"]).safe_substitute(static),
+        [Template(p).safe_substitute(static) for p in source["body"]],
+        spec["facts"],
+    )
+
+
+# ── OUTPUT FORMATS ───────────────────────────────────────────────
+def to_html(lines: list, language: str) -> str:
+    title, body = lines[0], lines[1:]
+    paragraphs = "\n".join(f"<p>{html.escape(p)}</p>" for p in body)
+    return (
+        f'<!DOCTYPE html>\n<html lang="{html.escape(language)}"><head><meta charset="utf-8">'
+        f"<title>{html.escape(title)}</title></head>\n<body>\n<h1>{html.escape(title)}</h1>\n"
+        f"{paragraphs}\n<footer><small>{html.escape(FOOTER)}</small></footer>\n</body></html>\n"
+    )
+
+
+def _wrap(text: str, width: int = 90) -> list:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    lines.append(line)
+    return lines
+
+
+def to_pdf(lines: list) -> bytes:
+    """Minimal single-font PDF (Helvetica, WinAnsi). Latin-script text only."""
+    rows = []
+    for para in lines + [FOOTER]:
+        rows.extend(_wrap(para.replace("₹", "Rs. ").replace("—", "-")))
+        rows.append("")
+    per_page = 52
+    pages = [rows[i:i + per_page] for i in range(0, len(rows), per_page)] or [[]]
+
+    objects = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    catalog = add(b"")
+    pages_obj = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    kids = []
+    for page_rows in pages:
+        ops = ["BT", "/F1 11 Tf", "14 TL", "50 800 Td"]
+        for row in page_rows:
+            escaped = row.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({escaped}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("cp1252", errors="replace")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_obj, font, content)
+        ))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj
+    objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % n + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for off in offsets:
+        out.write(b"%010d 00000 n \n" % off)
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref))
+    return out.getvalue()
+
+
+# ── PUBLIC API ───────────────────────────────────────────────────
+MEDIA_TYPES = {"html": "text/html; charset=utf-8", "pdf": "application/pdf"}
+
+
+def render_document(case_type: str, state: str, language: str, facts: dict, fmt: str = "html") -> bytes:
+    if fmt not in MEDIA_TYPES:
+        raise DocumentError(f"Unknown format '{fmt}' (use html or pdf)")
+    language = document_language(case_type, language)
+    if fmt == "pdf" and language != "en":
+        raise DocumentError("PDF output is English-only for now; use format=html for other languages")
+    lines = compile_document(case_type, state, language).render_text(facts)
+    if fmt == "pdf":
+        return to_pdf(lines)
+    return to_html(lines, language).encode("utf-8")
+
+
+def _render_one(item: dict):
+    try:
+        data = render_document(item["case_type"], item["state"], item.get("language", "en"),
+                               item.get("facts", {}), item.get("format", "html"))
+        return data, None
+    except DocumentError as e:
+        return None, str(e)
+
+
+_pool = None
+_pool_lock = threading.Lock()      # batches run on the threadpool; only one may create the pool
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: forking a process that already runs the event loop,
+                # the audit writer and the batch threads copies their locks mid-state
+                _pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def render_batch(items: list) -> tuple:
+    """Renders many documents in a process pool and returns (ZIP bytes, documents
+    rendered); the ZIP holds the documents plus errors.txt for any that failed."""
+    if len(items) < 16:
+        results = map(_render_one, items)  # not worth the IPC
+    else:
+        results = _get_pool().map(_render_one, items, chunksize=max(1, len(items) // 32))
+
+    out = io.BytesIO()
+    errors = []
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, (item, (data, error)) in enumerate(zip(items, results), start=1):
+            if error:
+                errors.append(f"{i}: {error}")
+                continue
+            zf.writestr(f"{i:05d}_{item['case_type']}_{item['state']}.{item.get('format', 'html')}", data)
+        if errors:
+            zf.writestr("errors.txt", "\n".join(errors) + "\n")
+    return out.getvalue(), len(items) - len(errors)
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
@@ -5,26 +5,56 @@
 ╚══════════════════════════════════════════════════════════╝
 """
 
+import time
+STARTUP_T0 = time.perf_counter()
+
 import os
 import json
-import time
+import asyncio
+import threading
 import random
-from datetime import datetime
+import hmac
+from datetime import datetime, date
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
-import anthropic  # pip install anthropic
+# anthropic (pip install anthropic) is imported lazily — see get_claude_client()
 
 # Import our legal data
 import sys
 sys.path.append(os.path.dirname(__file__))
-from data.legal_data import (
-    STATES, CASE_TYPES, MOCK_RESPONSES,
-    NGOS, MOCK_COURT_CASES, PLATFORM_STATS
-)
+from data.legal_data import STATES, CASE_TYPES, MOCK_RESPONSES, PLATFORM_STATS
+from singleflight import SingleFlight, StreamFlight, prompt_key
+from resilience import CircuitBreaker, CircuitOpenError, Resilience
+from cache import Cache, worker_rss_mb
+from records import NGO, legal_records
+from documents import DocumentError, MEDIA_TYPES, render_document, render_batch, shutdown_pool
+from search import get_index, relevant_snippets
+from calculator import DEPOSIT_TOOL, deposit_claim, deposit_claims_bulk, run_tool
+from screening import screen
+from reminders import ReminderScheduler, sink_from_env
+from bundle import BundleStore
+from ws_chat import ChatHub, Session, SessionStore
+from answers import AnswerReuse, LANGUAGE_NAMES, canonical_intent, detect_intent
+from audit import AuditLog, store_from_env
+from batch_jobs import BatchFull, BatchRunner, LocalBatchBackend, ProviderBatchBackend, page
+
+# Compact, typed views of the list-of-dict data (see records.py)
+COURT_CASES, NGO_RECORDS = legal_records()
+
+# ── STARTUP TIMELINE ─────────────────────────────────────────────
+# Milliseconds since this module started importing; reported by /api/health
+STARTUP_TIMELINE = {}
+
+
+def mark_startup(event: str):
+    STARTUP_TIMELINE.setdefault(event, round((time.perf_counter() - STARTUP_T0) * 1000, 1))
+
+
+mark_startup("imports_done")
 
 # ── APP SETUP ─────────────────────────────────────────────────────
 app = FastAPI(
@@ -40,12 +70,61 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # the bundle client reads its version from these to ask for a delta (?have=)
+    expose_headers=["ETag", "X-Bundle-Version", "X-Bundle-Type", "X-Bundle-Base"],
 )
 
 # ── CLAUDE CLIENT ─────────────────────────────────────────────────
 # Get your free API key at: https://console.anthropic.com
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
-claude_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
+_claude_client = None
+_claude_lock = threading.Lock()
+
+
+def get_claude_client():
+    """
+    Imports the SDK and builds the client on first use, keeping both off the cold-start path.
+    No SDK retries and a timeout of the guard's budget: llm_guard already retries by
+    hedging, and an attempt it abandons must not hold a thread for the SDK's 10 minutes.
+    """
+    global _claude_client
+    if _claude_client is None and ANTHROPIC_API_KEY:
+        with _claude_lock:
+            if _claude_client is None:
+                import anthropic
+                mark_startup("anthropic_imported")
+                _claude_client = anthropic.Anthropic(
+                    api_key=ANTHROPIC_API_KEY, timeout=llm_guard.budget_s, max_retries=0,
+                )
+                mark_startup("claude_client_ready")
+    return _claude_client
+
+CLAUDE_MODEL = "claude-opus-4-6"
+
+# Identical prompts arriving together share one upstream call / token stream
+chat_flight = SingleFlight()
+stream_flight = StreamFlight()
+
+# Completed replies, shared across workers when run via serve.py
+REPLY_CACHE_TTL = float(os.getenv("JUSTIA_REPLY_CACHE_TTL", "300"))
+reply_cache = Cache("reply", ttl=REPLY_CACHE_TTL)
+
+# Canonical answers and their localisations (0 disables reuse)
+CANONICAL_TTL = float(os.getenv("JUSTIA_CANONICAL_TTL", "86400"))
+LOCALISED_TTL = float(os.getenv("JUSTIA_LOCALISED_TTL", "21600"))
+TRANSLATE_MODEL = os.getenv("JUSTIA_TRANSLATE_MODEL", "claude-haiku-4-5")
+
+# Shared by /api/chat and /api/chat/stream: after N slow/failed calls,
+# traffic goes straight to the mock fallback for the cool-down period
+llm_guard = Resilience(
+    CircuitBreaker(
+        failure_threshold=int(os.getenv("JUSTIA_CB_FAILURES", "5")),
+        slow_call_s=float(os.getenv("JUSTIA_CB_SLOW_MS", "10000")) / 1000,
+        cooldown_s=float(os.getenv("JUSTIA_CB_COOLDOWN_S", "30")),
+    ),
+    budget_s=float(os.getenv("JUSTIA_LLM_BUDGET_MS", "20000")) / 1000,
+    hedge=os.getenv("JUSTIA_LLM_HEDGE", "1") == "1",
+)
 
 # ── SYSTEM PROMPT FOR JUSTIA ──────────────────────────────────────
 JUSTIA_SYSTEM_PROMPT = """You are JUSTIA, an AI legal information assistant for India. You help ordinary citizens understand their legal rights and navigate the legal system.
@@ -81,15 +160,47 @@ class ChatRequest(BaseModel):
     state: Optional[str] = None   # maharashtra, delhi, etc.
     case_type: Optional[str] = None
     conversation_history: list = []
+    session_id: Optional[str] = None   # groups turns in the audit log
 
 class CourtLookupRequest(BaseModel):
     case_number: str
     state: Optional[str] = None
+    session_id: Optional[str] = None
 
 class NGOSearchRequest(BaseModel):
     state: str
     case_type: str
 
+class ReminderRequest(BaseModel):
+    user_id: str
+    case_number: str
+    offsets_hours: list[int] = [72, 24, 2]   # hours before the hearing
+
+class DocumentRequest(BaseModel):
+    case_type: str                # rental_deposit, labour_wage, consumer_complaint
+    state: str
+    language: str = "en"          # en, hi (others fall back to en)
+    format: str = "html"          # html, pdf
+    facts: dict = {}              # names, addresses, amounts, dates — see documents.DOCUMENTS
+
+class DocumentBatchRequest(BaseModel):
+    documents: list[DocumentRequest]
+
+class DepositCalcRequest(BaseModel):
+    deposit_amount: float
+    vacated_on: date
+    refunded_on: Optional[date] = None
+    amount_refunded: float = 0.0
+    monthly_rent: Optional[float] = None
+    as_of: Optional[date] = None  # defaults to today
+
+class DepositBulkRequest(BaseModel):
+    tenancies: list[dict]          # same fields as DepositCalcRequest, dates as YYYY-MM-DD
+    as_of: Optional[date] = None
+
+class BatchChatRequest(BaseModel):
+    requests: list[ChatRequest]
+
 # ── HELPER: Build Context-Aware Prompt ────────────────────────────
 def build_context_prompt(req: ChatRequest) -> str:
     context_parts = []
@@ -114,6 +225,14 @@ CASE TYPE CONTEXT — {ct['name']}:
 - Success rate: {ct['success_rate_percent']}%
 """)
 
+    # Ground the answer in the few facts that match the question, so the
+    # model doesn't have to regenerate them (and we don't send all of them)
+    case_type = req.case_type if req.case_type in CASE_TYPES else None
+    snippets = relevant_snippets(req.message, k=4, case_type=case_type,
+                                 fallback_case_type=case_type or detect_intent(req.message))
+    if snippets:
+        context_parts.append("\nRELEVANT LEGAL FACTS:\n" + "\n".join(f"- {t}" for t in snippets) + "\n")
+
     language_instruction = {
         "hi": "Respond ENTIRELY in Hindi (Devanagari script).",
         "ta": "Respond ENTIRELY in Tamil script.",
@@ -125,6 +244,15 @@ CASE TYPE CONTEXT — {ct['name']}:
     return f"{language_instruction}\n\n{''.join(context_parts)}"
 
 
+# ── HELPER: Message History for Claude ────────────────────────────
+def build_messages(req: ChatRequest) -> list:
+    messages = []
+    for h in req.conversation_history[-10:]:  # last 10 messages for context
+        messages.append({"role": h["role"], "content": h["content"]})
+    messages.append({"role": "user", "content": req.message})
+    return messages
+
+
 # ══════════════════════════════════════════════════════════════════
 #  API ENDPOINTS
 # ══════════════════════════════════════════════════════════════════
@@ -139,6 +267,10 @@ def root():
         "endpoints": [
             "/api/chat",
             "/api/chat/stream",
+            "/ws/chat",
+            "/api/chat/batch",
+            "/api/health",
+            "/api/ready",
             "/api/states",
             "/api/case-types",
             "/api/legal-info/{case_type}/{state}",
@@ -146,6 +278,15 @@ def root():
             "/api/ngos",
             "/api/stats",
             "/api/documents/{case_type}",
+            "/api/documents/generate",
+            "/api/documents/generate/batch",
+            "/api/search",
+            "/api/calculate/deposit",
+            "/api/calculate/deposit/bulk",
+            "/api/legal-aid/screen",
+            "/api/reminders",
+            "/api/bundle",
+            "/api/audit/{session_id}",
         ]
     }
 
@@ -154,10 +295,54 @@ def root():
 def health():
     return {
         "status": "healthy",
-        "claude_available": claude_client is not None,
+        "claude_available": bool(ANTHROPIC_API_KEY),
+        "coalescing": {"chat": chat_flight.stats(), "stream": stream_flight.stats()},
+        "llm_circuit": llm_guard.snapshot(),
+        "reminders": reminder_scheduler.stats(),
+        "bundle": bundle_store.stats(),
+        "reply_cache": reply_cache.stats(),
+        "websocket": chat_hub.stats(),
+        "answer_reuse": answer_reuse.stats(),
+        "audit": audit_log.stats(),
+        "batch": batch_runner.stats(),
+        "worker": {
+            "id": os.getenv("JUSTIA_WORKER_ID", "0"),
+            "pid": os.getpid(),
+            "rss_mb": worker_rss_mb(),
+        },
+        "ready": warmup_done.is_set(),
+        "startup_timeline_ms": STARTUP_TIMELINE,
         "timestamp": datetime.now().isoformat(),
     }
 
+# ── READINESS ─────────────────────────────────────────────────────
+# /api/health is liveness (the process answers); /api/ready turns 200 only
+# once the background warm-up has loaded the SDK, so the first real chat
+# request doesn't pay for it.
+warmup_done = threading.Event()
+
+
+def warm_up():
+    try:
+        get_claude_client()
+    except Exception as e:
+        print(f"Claude client warm-up failed: {e}")
+    mark_startup("ready")
+    warmup_done.set()
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    mark_startup("server_started")
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+
+@app.get("/api/ready")
+def ready():
+    if not warmup_done.is_set():
+        raise HTTPException(503, "Warming up")
+    return {"status": "ready", "startup_timeline_ms": STARTUP_TIMELINE}
+
 # ── CHAT ENDPOINT (Main AI) ───────────────────────────────────────
 @app.post("/api/chat")
 async def chat(req: ChatRequest):
@@ -167,81 +352,514 @@ async def chat(req: ChatRequest):
     """
     start_time = time.time()
 
-    # Build message history for Claude
-    messages = []
-    for h in req.conversation_history[-10:]:  # last 10 messages for context
-        messages.append({"role": h["role"], "content": h["content"]})
-    messages.append({"role": "user", "content": req.message})
-
-    context = build_context_prompt(req)
+    messages = build_messages(req)
+    system = JUSTIA_SYSTEM_PROMPT + "\n\n" + build_context_prompt(req)
 
     # ── Try Claude API ────────────────────────────────────────────
-    if claude_client:
+    if ANTHROPIC_API_KEY:
         try:
-            response = claude_client.messages.create(
-                model="claude-opus-4-6",
-                max_tokens=1024,
-                system=JUSTIA_SYSTEM_PROMPT + "\n\n" + context,
-                messages=messages,
-            )
-            reply = response.content[0].text
-
-            return {
+            intent = canonical_intent(req) if CANONICAL_TTL else None
+            if intent:
+                return audit_chat(req, {
+                    "reply": await answer_reuse.answer(req, intent),
+                    "source": "claude",
+                    "reused": True,
+                    "language": req.language,
+                    "response_time_ms": round((time.time() - start_time) * 1000),
+                    "disclaimer": True,
+                })
+
+            # Concurrent identical prompts wait on the same upstream call;
+            # the guard hedges slow calls and enforces the latency budget.
+            key = prompt_key(system, messages, CLAUDE_MODEL)
+            reply = await reply_cache.aget(key) if REPLY_CACHE_TTL else None
+            if reply is None:
+                reply = await chat_flight.do(
+                    key, lambda: llm_guard.run(lambda: claude_complete(system, messages)),
+                )
+                if REPLY_CACHE_TTL:
+                    await reply_cache.aset(key, reply)
+
+            return audit_chat(req, {
                 "reply": reply,
                 "source": "claude",
                 "language": req.language,
                 "response_time_ms": round((time.time() - start_time) * 1000),
                 "disclaimer": True,
-            }
+            })
 
+        except CircuitOpenError:
+            audit_log.record("fallback", req.session_id, reason="circuit_open")
+        except asyncio.TimeoutError:
+            print(f"Claude API exceeded {llm_guard.budget_s}s budget")
+            audit_log.record("fallback", req.session_id, reason="timeout")
         except Exception as e:
             # Fall through to mock
             print(f"Claude API error: {e}")
+            audit_log.record("fallback", req.session_id, reason="error", error=str(e))
 
     # ── Fallback: Smart Mock Response ────────────────────────────
     reply = generate_mock_response(req)
-    return {
+    return audit_chat(req, {
         "reply": reply,
         "source": "mock",
         "language": req.language,
         "response_time_ms": round((time.time() - start_time) * 1000),
         "disclaimer": True,
-    }
+    })
+
+
+def audit_chat(req: ChatRequest, response: dict) -> dict:
+    audit_log.record(
+        "chat", req.session_id,
+        message=req.message, language=req.language, state=req.state, case_type=req.case_type,
+        reply=response["reply"], source=response["source"], response_time_ms=response["response_time_ms"],
+    )
+    return response
+
+
+def claude_complete(system: str, messages: list) -> str:
+    """One chat turn. If Claude asks for the deposit calculator, run it and continue."""
+    messages = list(messages)
+    for _ in range(3):
+        response = get_claude_client().messages.create(
+            model=CLAUDE_MODEL,
+            max_tokens=1024,
+            system=system,
+            messages=messages,
+            tools=[DEPOSIT_TOOL],
+        )
+        if response.stop_reason != "tool_use":
+            break
+        messages.append({"role": "assistant", "content": response.content})
+        messages.append({"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": block.id, "content": json.dumps(run_tool(block.name, block.input))}
+            for block in response.content if block.type == "tool_use"
+        ]})
+    return "".join(block.text for block in response.content if block.type == "text")
+
+
+def claude_text_stream(system: str, messages: list):
+    with get_claude_client().messages.stream(
+        model=CLAUDE_MODEL,
+        max_tokens=1024,
+        system=system,
+        messages=messages,
+    ) as stream:
+        yield from stream.text_stream
+
+
+def claude_generate(system: str, messages: list, model: str = CLAUDE_MODEL, max_tokens: int = 1024) -> tuple:
+    """Plain completion (no tools). Returns (text, input + output tokens)."""
+    response = get_claude_client().messages.create(
+        model=model,
+        max_tokens=max_tokens,
+        system=system,
+        messages=messages,
+    )
+    text = "".join(block.text for block in response.content if block.type == "text")
+    return text, response.usage.input_tokens + response.usage.output_tokens
+
+
+# ── CROSS-LANGUAGE ANSWER REUSE ───────────────────────────────────
+# Generic first-turn questions get one English answer per (intent, state, case_type)
+# from CLAUDE_MODEL; other languages translate it once with TRANSLATE_MODEL.
+CANONICAL_QUESTION = "What are my rights, which documents should I collect, and what is my next step for a {} problem?"
+TRANSLATE_PROMPT = (
+    "Translate the legal information below into {language} for ordinary citizens in India. "
+    "Keep the markdown, emoji, numbers, amounts, phone numbers, URLs and names of Acts exactly as they are. "
+    "Use simple everyday words. Output only the translation."
+)
+
+
+async def canonical_answer(intent: str, state: Optional[str], case_type: Optional[str]) -> tuple:
+    question = CANONICAL_QUESTION.format(CASE_TYPES[intent]["name"])
+    req = ChatRequest(message=question, language="en", state=state, case_type=case_type or intent)
+    system = JUSTIA_SYSTEM_PROMPT + "\n\n" + build_context_prompt(req)
+    return await llm_guard.run(lambda: claude_generate(system, build_messages(req)))
+
+
+async def localise_answer(text: str, language: str) -> tuple:
+    system = TRANSLATE_PROMPT.format(language=LANGUAGE_NAMES[language])
+    messages = [{"role": "user", "content": text}]
+    return await llm_guard.run(lambda: claude_generate(system, messages, model=TRANSLATE_MODEL, max_tokens=2048))
+
+
+answer_reuse = AnswerReuse(
+    canonical_answer,
+    localise_answer,
+    canonical_cache=Cache("canonical", ttl=CANONICAL_TTL),
+    localised_cache=Cache("localised", ttl=LOCALISED_TTL),
+    flight=chat_flight,
+)
 
 # ── STREAMING CHAT ────────────────────────────────────────────────
+async def stream_reply(req: ChatRequest, mock_delay: float = 0.01):
+    """
+    Text deltas for one chat turn, shared by the SSE and WebSocket transports.
+    Concurrent identical prompts share one upstream stream; late joiners replay the prefix.
+    Falls back to the mock reply when the circuit is open or no token arrives in budget.
+    """
+    async def mock_deltas():
+        # Mock streaming — character by character
+        for char in generate_mock_response(req):
+            yield char
+            await asyncio.sleep(mock_delay)
+
+    intent = canonical_intent(req) if ANTHROPIC_API_KEY and CANONICAL_TTL else None
+    if intent:
+        try:
+            reply = await answer_reuse.answer(req, intent)
+        except Exception as e:
+            print(f"Answer reuse failed, streaming a fresh reply: {e!r}")
+        else:
+            yield reply
+            return
+
+    if not ANTHROPIC_API_KEY or not llm_guard.breaker.allow():
+        if ANTHROPIC_API_KEY:
+            audit_log.record("fallback", req.session_id, reason="circuit_open", stream=True)
+        async for char in mock_deltas():
+            yield char
+        return
+
+    messages = build_messages(req)
+    system = JUSTIA_SYSTEM_PROMPT + "\n\n" + build_context_prompt(req)
+    start = time.monotonic()
+    deltas = stream_flight.subscribe(
+        prompt_key(system, messages, CLAUDE_MODEL),
+        lambda: claude_text_stream(system, messages),
+    )
+    try:
+        first = await asyncio.wait_for(deltas.__anext__(), timeout=llm_guard.budget_s)
+    except StopAsyncIteration:
+        first = None
+    except Exception as e:
+        print(f"Claude stream error: {e!r}")
+        llm_guard.record_stream(time.monotonic() - start, ok=False)
+        reason = "first_token_timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+        audit_log.record("fallback", req.session_id, reason=reason, stream=True)
+        async for char in mock_deltas():
+            yield char
+        return
+    llm_guard.record_stream(time.monotonic() - start, ok=True)
+
+    if first is not None:
+        yield first
+        try:
+            async for text in deltas:
+                yield text
+        except Exception as e:
+            print(f"Claude stream error: {e!r}")
+
+
 @app.post("/api/chat/stream")
 async def chat_stream(req: ChatRequest):
     """
     Streaming chat for real-time typewriter effect in frontend.
     """
-    if not claude_client:
-        # Mock streaming — yield character by character
-        async def mock_stream():
-            reply = generate_mock_response(req)
-            for char in reply:
-                yield f"data: {json.dumps({'delta': char})}\n\n"
-                await asyncio.sleep(0.01)
-            yield "data: [DONE]\n\n"
-        return StreamingResponse(mock_stream(), media_type="text/event-stream")
+    async def sse():
+        parts = []
+        async for text in stream_reply(req):
+            parts.append(text)
+            yield f"data: {json.dumps({'delta': text})}\n\n"
+        yield "data: [DONE]\n\n"
+        audit_log.record("chat_stream", req.session_id, message=req.message, language=req.language,
+                         state=req.state, case_type=req.case_type, reply="".join(parts))
+
+    return StreamingResponse(sse(), media_type="text/event-stream")
+
+# ── WEBSOCKET CHAT ────────────────────────────────────────────────
+def session_reply(session: Session, message: str):
+    return stream_reply(ChatRequest(
+        message=message,
+        language=session.language,
+        state=session.state,
+        case_type=session.case_type,
+        conversation_history=session.history,
+        session_id=session.id,
+    ))
+
+
+def audit_ws_turn(session: Session, msg_id: int, message: str, reply: str):
+    audit_log.record("chat_ws", session.id, msg_id=msg_id, message=message, language=session.language,
+                     state=session.state, case_type=session.case_type, reply=reply)
+
+
+chat_hub = ChatHub(
+    session_reply,
+    SessionStore(ttl=float(os.getenv("JUSTIA_WS_SESSION_TTL_S", "1800"))),
+    heartbeat_s=float(os.getenv("JUSTIA_WS_HEARTBEAT_S", "20")),
+    coalesce_s=float(os.getenv("JUSTIA_WS_COALESCE_MS", "50")) / 1000,
+    on_turn=audit_ws_turn,
+    allowed={"language": LANGUAGE_NAMES, "state": STATES, "case_type": CASE_TYPES},
+)
 
-    messages = []
-    for h in req.conversation_history[-10:]:
-        messages.append({"role": h["role"], "content": h["content"]})
-    messages.append({"role": "user", "content": req.message})
-    context = build_context_prompt(req)
 
-    async def claude_stream():
-        with claude_client.messages.stream(
-            model="claude-opus-4-6",
-            max_tokens=1024,
-            system=JUSTIA_SYSTEM_PROMPT + "\n\n" + context,
-            messages=messages,
-        ) as stream:
-            for text in stream.text_stream:
-                yield f"data: {json.dumps({'delta': text})}\n\n"
-        yield "data: [DONE]\n\n"
+@app.websocket("/ws/chat")
+async def chat_ws(websocket: WebSocket):
+    """
+    Persistent chat: many sessions and turns over one connection, with token
+    deltas pushed as they arrive. History is kept server-side per session_id
+    (issued by the server, with a resume token for reconnects), so each turn
+    sends only the new message. Protocol is documented in ws_chat.py.
+    """
+    await chat_hub.serve(websocket)
+
+
+# ── BULK CHAT JOBS ────────────────────────────────────────────────
+# Batch traffic never touches llm_guard, the flights or the request threadpool:
+# provider batches when the SDK has them, else a small pool of its own.
+local_claude_batches = LocalBatchBackend(
+    lambda item: claude_complete(item.system, item.messages), "claude",
+    concurrency=int(os.getenv("JUSTIA_BATCH_CONCURRENCY", "2")),
+)
+mock_batches = LocalBatchBackend(lambda item: generate_mock_response(item.req), "mock", concurrency=1)
+
+
+def batch_backend():
+    if not ANTHROPIC_API_KEY:
+        return mock_batches
+    client = get_claude_client()
+    if hasattr(client.messages, "batches"):
+        return ProviderBatchBackend(client, CLAUDE_MODEL, poll_s=float(os.getenv("JUSTIA_BATCH_POLL_S", "30")))
+    return local_claude_batches
+
+
+batch_runner = BatchRunner(
+    batch_backend,
+    fallback=lambda item: generate_mock_response(item.req),
+    cache=reply_cache if REPLY_CACHE_TTL else None,
+    shared=Cache("batch_job", ttl=86400),
+    max_items=int(os.getenv("JUSTIA_BATCH_MAX_ITEMS", "1000")),
+)
+
+
+@app.on_event("startup")
+async def start_batch_runner():
+    asyncio.create_task(batch_runner.run())
+
+
+@app.post("/api/chat/batch", status_code=202)
+async def submit_chat_batch(req: BatchChatRequest):
+    """
+    Queues many chat requests (e.g. an NGO's pre-collected intake questions) as one job.
+    Identical prompts are answered once. Poll GET /api/chat/batch/{job_id}
+    or stream GET /api/chat/batch/{job_id}/stream for results.
+    """
+    # refuse an oversized body before building a context prompt for each request
+    try:
+        batch_runner.check(len(req.requests))
+    except BatchFull as e:
+        raise HTTPException(429, f"Batch queue is full ({e}); retry later")
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    entries = []
+    for r in req.requests:
+        messages = build_messages(r)
+        system = JUSTIA_SYSTEM_PROMPT + "\n\n" + build_context_prompt(r)
+        entries.append((prompt_key(system, messages, CLAUDE_MODEL), r, system, messages))
+    try:
+        job = await batch_runner.submit(entries)
+    except BatchFull as e:
+        raise HTTPException(429, f"Batch queue is full ({e}); retry later")
+    summary = job.as_dict()
+    del summary["results"]
+    return summary
+
+
+async def _batch_job(job_id: str) -> dict:
+    """Snapshot of a job accepted by another worker (serve.py), or 404."""
+    snapshot = await batch_runner.shared.aget(job_id)
+    if snapshot is None:
+        raise HTTPException(404, f"Batch job '{job_id}' not found")
+    return snapshot
+
+
+@app.get("/api/chat/batch/{job_id}")
+async def get_chat_batch(job_id: str, offset: int = 0, limit: Optional[int] = None):
+    job = batch_runner.get(job_id)
+    if job is None:
+        snapshot = await _batch_job(job_id)
+        snapshot["results"] = page(snapshot["results"], offset, limit)
+        return snapshot
+    return job.as_dict(offset, limit)
+
+
+@app.get("/api/chat/batch/{job_id}/stream")
+async def stream_chat_batch(job_id: str):
+    """NDJSON: one line per result as it completes, then a summary line."""
+    job = batch_runner.get(job_id)
+    snapshot = await _batch_job(job_id) if job is None else None
+
+    async def lines():
+        if job is not None:
+            async for result in job.stream.follow():
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+            summary = job.as_dict()
+        else:
+            # another worker owns it: send what it has published so far
+            summary = snapshot
+            for result in summary["results"]:
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        del summary["results"]
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# ── AUDIT LOG ─────────────────────────────────────────────────────
+# JUSTIA_AUDIT = sqlite:<path> | log:<directory> | off
+# JUSTIA_AUDIT_POLICY = drop_newest | drop_oldest | block (when the queue is full;
+#   block only applies to sync handlers, async ones never wait on the loop)
+# JUSTIA_ADMIN_TOKEN — required to read the audit trail; unset disables reads
+audit_log = AuditLog(
+    None,
+    max_queue=int(os.getenv("JUSTIA_AUDIT_QUEUE", "10000")),
+    policy=os.getenv("JUSTIA_AUDIT_POLICY", "drop_newest"),
+)
+
+
+@app.on_event("startup")
+async def start_audit_log():
+    # Resolved here, not at import, so each serve.py worker opens its own writer
+    audit_log.store = store_from_env(os.getenv("JUSTIA_AUDIT", "sqlite:justia_audit.db"),
+                                     os.getenv("JUSTIA_WORKER_ID"))
+    audit_log.start()
+
+
+@app.on_event("shutdown")
+async def close_audit_log():
+    await asyncio.to_thread(audit_log.close)
+
+
+@app.get("/api/audit/{session_id}")
+async def get_audit_events(session_id: str, since: float = 0, limit: int = 200,
+                           authorization: Optional[str] = Header(None)):
+    """
+    Audit trail for one session (chat turns, fallbacks, court lookups), oldest first.
+    Transcripts are sensitive: needs "Authorization: Bearer <JUSTIA_ADMIN_TOKEN>".
+    Events become visible once the writer commits them, within ~50ms.
+    """
+    admin_token = os.getenv("JUSTIA_ADMIN_TOKEN", "")
+    if not admin_token:
+        raise HTTPException(403, "Audit reads are disabled (set JUSTIA_ADMIN_TOKEN)")
+    if not hmac.compare_digest((authorization or "").encode(), f"Bearer {admin_token}".encode()):
+        raise HTTPException(401, "Admin token required")
+    if not audit_log.enabled:
+        raise HTTPException(404, "Audit log is disabled (JUSTIA_AUDIT=off)")
+    events = await asyncio.to_thread(audit_log.query, session_id, since, min(max(limit, 1), 1000))
+    return {"session_id": session_id, "events": events}
+
+
+# ── HEARING REMINDERS ─────────────────────────────────────────────
+# Sink: JUSTIA_REMINDER_SINK = log | outbox:<sqlite path> | webhook:<url>
+# The schedule lives in one process. Under serve.py with more than one worker
+# each would hold a different schedule and id counter, so the API answers 409
+# there; run reminders with --workers 1 (or plain uvicorn).
+reminder_scheduler = ReminderScheduler(
+    COURT_CASES.get, sink_from_env(os.getenv("JUSTIA_REMINDER_SINK", "log")),
+)
+
+
+def reminders_enabled() -> bool:
+    return int(os.getenv("JUSTIA_WORKER_COUNT", "1")) <= 1
+
 
-    return StreamingResponse(claude_stream(), media_type="text/event-stream")
+def _require_reminders():
+    if not reminders_enabled():
+        raise HTTPException(409, "Hearing reminders need a single-worker deployment (serve.py --workers 1)")
+
+
+@app.on_event("startup")
+async def start_reminders():
+    if not reminders_enabled():
+        return
+    reminder_scheduler.path = os.getenv("JUSTIA_REMINDER_FILE", "justia_reminders.bin")
+    reminder_scheduler.load()
+    asyncio.create_task(reminder_scheduler.run())
+
+
+@app.on_event("shutdown")
+async def save_reminders():
+    if reminders_enabled():
+        reminder_scheduler.save()
+
+
+def _subscription_json(sub) -> dict:
+    return {
+        "id": sub.id,
+        "user_id": sub.user_id,
+        "case_number": sub.case_number,
+        "hearing_at": reminder_scheduler.hearing_at(sub.hearing_ordinal).isoformat(),
+        "reminders_at": reminder_scheduler.pending_times(sub),
+    }
+
+
+# async: the scheduler lives on the event loop and must not be touched from the threadpool
+@app.post("/api/reminders")
+async def subscribe_reminder(req: ReminderRequest):
+    """Subscribes a user to reminders before a case's next hearing."""
+    _require_reminders()
+    try:
+        sub = reminder_scheduler.subscribe(req.user_id, req.case_number, req.offsets_hours)
+    except KeyError:
+        raise HTTPException(404, f"Case {req.case_number} not found")
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return _subscription_json(sub)
+
+
+@app.get("/api/reminders")
+async def list_reminders(user_id: str):
+    _require_reminders()
+    return {"subscriptions": [_subscription_json(s) for s in reminder_scheduler.for_user(user_id)]}
+
+
+@app.delete("/api/reminders/{subscription_id}")
+async def unsubscribe_reminder(subscription_id: int):
+    _require_reminders()
+    if not reminder_scheduler.unsubscribe(subscription_id):
+        raise HTTPException(404, "Subscription not found")
+    return {"deleted": subscription_id}
+
+# ── OFFLINE DATA BUNDLE ───────────────────────────────────────────
+SUPPORTED_LANGUAGES = ("en", "hi", "ta", "te", "bn")
+bundle_store = BundleStore(os.getenv("JUSTIA_BUNDLE_DIR"))
+
+
+@app.get("/api/bundle")
+def get_bundle(request: Request, languages: str = "en", have: Optional[str] = None):
+    """
+    All states, case types, NGOs and mock responses for the given languages in one
+    gzipped JSON file, versioned by content hash. Clients pass the version they hold
+    (?have= or If-None-Match) and get 304, a binary delta, or the full bundle.
+    """
+    langs = tuple(sorted({l.strip() for l in languages.split(",")} & set(SUPPORTED_LANGUAGES)))
+    if not langs:
+        raise HTTPException(400, f"languages must be a comma-separated subset of {', '.join(SUPPORTED_LANGUAGES)}")
+    version, raw, full = bundle_store.current(langs)
+    have = have or request.headers.get("if-none-match", "").strip('" ') or None
+    headers = {"ETag": f'"{version}"', "X-Bundle-Version": version, "Cache-Control": "no-cache"}
+
+    if have == version:
+        bundle_store.record("not_modified", 0, len(full))
+        return Response(status_code=304, headers=headers)
+    if have:
+        patch = bundle_store.delta(have, version, raw)
+        if patch is not None and len(patch) < len(full):
+            bundle_store.record("delta", len(patch), len(full))
+            return Response(
+                patch,
+                media_type="application/vnd.justia.delta",
+                headers={**headers, "X-Bundle-Type": "delta", "X-Bundle-Base": have},
+            )
+    bundle_store.record("full", len(full), len(full))
+    return Response(
+        full,
+        media_type="application/json",
+        headers={**headers, "X-Bundle-Type": "full", "Content-Encoding": "gzip"},
+    )
 
 # ── STATES LIST ───────────────────────────────────────────────────
 @app.get("/api/states")
@@ -334,14 +952,16 @@ def court_lookup(req: CourtLookupRequest):
     time.sleep(0.5)
 
     # Search mock cases
-    for case in MOCK_COURT_CASES:
-        if req.case_number.upper() in case["case_number"].upper():
-            return {
-                "found": True,
-                "case": case,
-                "source": "eCourts (mock)",
-                "disclaimer": "Case data is for demonstration. For live data, visit ecourts.gov.in",
-            }
+    case = COURT_CASES.search(req.case_number)
+    audit_log.record("court_lookup", req.session_id, case_number=req.case_number, state=req.state,
+                     found=case is not None)
+    if case is not None:
+        return {
+            "found": True,
+            "case": case.as_dict(),
+            "source": "eCourts (mock)",
+            "disclaimer": "Case data is for demonstration. For live data, visit ecourts.gov.in",
+        }
 
     # Not found — return realistic not-found response
     return {
@@ -355,12 +975,7 @@ def court_lookup(req: CourtLookupRequest):
 @app.post("/api/ngos")
 def find_ngos(req: NGOSearchRequest):
     """Finds relevant NGOs based on state and case type."""
-    matches = []
-    for ngo in NGOS:
-        state_match = req.state in ngo["states"] or "all" in ngo["states"]
-        type_match = req.case_type in ngo["focus"] or "all" in ngo["focus"]
-        if state_match or type_match:
-            matches.append(ngo)
+    matches = [ngo for ngo in NGO_RECORDS if ngo.serves(req.state, req.case_type)]
 
     # Always include NALSA (national)
     matches.append({
@@ -375,7 +990,7 @@ def find_ngos(req: NGOSearchRequest):
     })
 
     return {
-        "ngos": matches[:5],  # Top 5 results
+        "ngos": [m.as_dict() if isinstance(m, NGO) else m for m in matches[:5]],  # Top 5 results
         "total_found": len(matches),
         "state": req.state,
         "case_type": req.case_type,
@@ -393,6 +1008,112 @@ def get_documents(case_type: str):
         "tip": "Collect ALL documents before approaching any forum. Missing documents = delayed resolution.",
     }
 
+# ── FULL-TEXT SEARCH ──────────────────────────────────────────────
+@app.get("/api/search")
+def search_legal_data(q: str, case_type: Optional[str] = None, k: int = 5):
+    """BM25 search over acts, rights, steps, documents and deposit rules."""
+    start = time.perf_counter()
+    results = get_index().search(q, k=max(1, min(k, 20)), case_type=case_type)
+    return {
+        "query": q,
+        "results": results,
+        "took_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+# ── DEPOSIT CALCULATOR ────────────────────────────────────────────
+@app.post("/api/calculate/deposit")
+def calculate_deposit(req: DepositCalcRequest):
+    """Interest owed on a delayed deposit refund, filing deadline and days remaining."""
+    try:
+        result = deposit_claim(req.deposit_amount, req.vacated_on, req.refunded_on,
+                               req.amount_refunded, req.monthly_rent, req.as_of)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {**result, "rules": CASE_TYPES["rental_deposit"]["deposit_rules"]}
+
+MAX_BULK_TENANCIES = 100_000
+
+@app.post("/api/calculate/deposit/bulk")
+def calculate_deposit_bulk(req: DepositBulkRequest):
+    """Vectorised version for NGOs / partners: up to 100k tenancies per call, results in input order."""
+    if len(req.tenancies) > MAX_BULK_TENANCIES:
+        raise HTTPException(400, f"At most {MAX_BULK_TENANCIES} tenancies per call")
+    start = time.perf_counter()
+    try:
+        results = deposit_claims_bulk(req.tenancies, req.as_of)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {
+        "results": results,
+        "count": len(results),
+        "took_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+# ── LEGAL AID SCREENING (bulk) ────────────────────────────────────
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streams the response while the request body is still being read.
+    Starlette's StreamingResponse listens for disconnects on `receive`, which
+    would swallow upload chunks; here the body iterator is the only reader
+    (request.stream() raises ClientDisconnect itself).
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@app.post("/api/legal-aid/screen")
+async def screen_legal_aid(request: Request, format: Optional[str] = None):
+    """
+    Screens an NGO intake list for free legal aid eligibility.
+    Body: raw CSV (header: state,annual_income,category,case_type) or NDJSON,
+    e.g. curl --data-binary @intake.csv -H "Content-Type: text/csv".
+    Results stream back as NDJSON while the upload is still being read.
+    """
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(400, "format must be csv or ndjson")
+    return DuplexStreamingResponse(screen(request.stream(), fmt), media_type="application/x-ndjson")
+
+# ── DOCUMENT GENERATION ───────────────────────────────────────────
+@app.post("/api/documents/generate")
+def generate_document(req: DocumentRequest):
+    """Renders a legal notice / consumer complaint as HTML or PDF."""
+    try:
+        data = render_document(req.case_type, req.state, req.language, req.facts, req.format)
+    except DocumentError as e:
+        raise HTTPException(400, str(e))
+    PLATFORM_STATS["documents_generated"] += 1
+    filename = f"{req.case_type}_{req.state}.{req.format}"
+    return Response(
+        data,
+        media_type=MEDIA_TYPES[req.format],
+        headers={"Content-Disposition": f'inline; filename="{filename}"'},
+    )
+
+MAX_BATCH_DOCUMENTS = 1000
+
+
+@app.on_event("shutdown")
+async def stop_document_pool():
+    await asyncio.to_thread(shutdown_pool)
+
+
+@app.post("/api/documents/generate/batch")
+def generate_documents_batch(req: DocumentBatchRequest):
+    """Bulk mode for NGOs: renders up to 1000 documents in a process pool, returned as a ZIP."""
+    if not req.documents:
+        raise HTTPException(400, "No documents requested")
+    if len(req.documents) > MAX_BATCH_DOCUMENTS:
+        raise HTTPException(400, f"At most {MAX_BATCH_DOCUMENTS} documents per batch")
+    data, rendered = render_batch([d.model_dump() for d in req.documents])
+    PLATFORM_STATS["documents_generated"] += rendered
+    return Response(
+        data,
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="justia_documents.zip"'},
+    )
+
 # ── PLATFORM STATS ────────────────────────────────────────────────
 @app.get("/api/stats")
 def get_stats():
@@ -413,20 +1134,20 @@ def generate_mock_response(req: ChatRequest) -> str:
     Generates structured, realistic mock responses when Claude API is unavailable.
     Detects intent from message and returns appropriate legal information.
     """
-    msg = req.message.lower()
     lang = req.language
 
     # Detect case type from message
-    if any(w in msg for w in ["deposit", "rent", "landlord", "tenant", "किराया", "வாடகை", "అద్దె", "ভাড়া"]):
+    intent = detect_intent(req.message)
+    if intent == "rental_deposit":
         return get_rental_response(req.state, lang)
 
-    elif any(w in msg for w in ["salary", "wage", "job", "employer", "labour", "वेतन", "ஊதியம்", "జీతం", "মজুরি"]):
+    elif intent == "labour_wage":
         return get_labour_response(req.state, lang)
 
-    elif any(w in msg for w in ["consumer", "product", "refund", "defect", "ecommerce", "उत्पाद", "பொருள்"]):
+    elif intent == "consumer_complaint":
         return get_consumer_response(req.state, lang)
 
-    elif any(w in msg for w in ["violence", "domestic", "husband", "wife", "घरेलू", "வன்முறை"]):
+    elif intent == "domestic_violence":
         return get_dv_response(lang)
 
     else:
@@ -570,6 +1291,10 @@ Contact your district's **Protection Officer** — this service is completely FR
 
 
 # ── RUN ───────────────────────────────────────────────────────────
+mark_startup("app_ready")
+
+
+# Development server. For multiple workers with shared caches: python serve.py
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,163 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Compact record types for court cases and NGOs
+#  __slots__ classes, interned categorical strings, dates as
+#  ordinal ints, order histories packed into arrays
+# ═══════════════════════════════════════════════════════════════
+
+import sys
+from array import array
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, Optional
+
+
+def _ordinal(iso: Optional[str]) -> int:
+    return date.fromisoformat(iso).toordinal() if iso else 0
+
+
+def _iso(ordinal: int) -> Optional[str]:
+    return date.fromordinal(ordinal).isoformat() if ordinal else None
+
+
+# ── COURT CASE ───────────────────────────────────────────────────
+class CourtCase:
+    """One eCourts case. Courts, types, statuses, stages and judges repeat
+    across millions of rows, so they are interned; dates are day ordinals."""
+
+    __slots__ = (
+        "case_number", "court", "petitioner", "respondent", "case_type",
+        "filed", "last_hearing", "next_hearing", "status", "stage", "judge",
+        "order_dates", "order_texts",
+    )
+
+    def __init__(self, case_number, court, petitioner, respondent, case_type,
+                 filed, last_hearing, next_hearing, status, stage, judge,
+                 order_dates, order_texts):
+        self.case_number = case_number
+        self.court = sys.intern(court)
+        self.petitioner = petitioner
+        self.respondent = respondent
+        self.case_type = sys.intern(case_type)
+        self.filed = filed
+        self.last_hearing = last_hearing
+        self.next_hearing = next_hearing
+        self.status = sys.intern(status)
+        self.stage = sys.intern(stage)
+        self.judge = sys.intern(judge)
+        self.order_dates = order_dates      # array('i') of day ordinals
+        self.order_texts = order_texts      # tuple[str, ...], same length
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "CourtCase":
+        orders = d.get("orders", [])
+        return cls(
+            d["case_number"], d["court"], d["petitioner"], d["respondent"], d["case_type"],
+            _ordinal(d.get("filed_date")), _ordinal(d.get("last_hearing")), _ordinal(d.get("next_hearing")),
+            d["status"], d["stage"], d["judge"],
+            array("i", (_ordinal(o["date"]) for o in orders)),
+            tuple(sys.intern(o["order"]) for o in orders),
+        )
+
+    @property
+    def next_hearing_date(self) -> Optional[date]:
+        return date.fromordinal(self.next_hearing) if self.next_hearing else None
+
+    def as_dict(self) -> dict:
+        """eCourts-shaped dict, built only when a response is serialised."""
+        return {
+            "case_number": self.case_number,
+            "court": self.court,
+            "petitioner": self.petitioner,
+            "respondent": self.respondent,
+            "case_type": self.case_type,
+            "filed_date": _iso(self.filed),
+            "last_hearing": _iso(self.last_hearing),
+            "next_hearing": _iso(self.next_hearing),
+            "status": self.status,
+            "stage": self.stage,
+            "judge": self.judge,
+            "orders": [
+                {"date": _iso(d), "order": text}
+                for d, text in zip(self.order_dates, self.order_texts)
+            ],
+        }
+
+
+class CourtCaseTable:
+    """Case records with an exact-match index on the upper-cased case number."""
+
+    def __init__(self, cases: Iterable[CourtCase]):
+        self.cases = list(cases)
+        self._keys = [c.case_number.upper() for c in self.cases]
+        self._by_number = {k: c for k, c in zip(self._keys, self.cases)}
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[dict]) -> "CourtCaseTable":
+        return cls(CourtCase.from_dict(r) for r in rows)
+
+    def get(self, case_number: str) -> Optional[CourtCase]:
+        return self._by_number.get(case_number.upper())
+
+    def search(self, query: str) -> Optional[CourtCase]:
+        """Exact case number first, then the first case whose number contains the query."""
+        q = query.upper()
+        found = self._by_number.get(q)
+        if found is not None:
+            return found
+        for key, case in zip(self._keys, self.cases):
+            if q in key:
+                return case
+        return None
+
+    def __iter__(self):
+        return iter(self.cases)
+
+    def __len__(self):
+        return len(self.cases)
+
+
+# ── NGO ──────────────────────────────────────────────────────────
+class NGO:
+    __slots__ = ("name", "focus", "states", "phone", "email", "url", "free")
+
+    def __init__(self, name, focus, states, phone, email, url, free):
+        self.name = name
+        self.focus = tuple(sys.intern(f) for f in focus)
+        self.states = tuple(sys.intern(s) for s in states)
+        self.phone = phone
+        self.email = email
+        self.url = url
+        self.free = free
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "NGO":
+        return cls(d["name"], d["focus"], d["states"], d["phone"], d["email"], d["url"], d["free"])
+
+    def serves(self, state: str, case_type: str) -> bool:
+        state_match = state in self.states or "all" in self.states
+        type_match = case_type in self.focus or "all" in self.focus
+        return state_match or type_match
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "focus": list(self.focus),
+            "states": list(self.states),
+            "phone": self.phone,
+            "email": self.email,
+            "url": self.url,
+            "free": self.free,
+        }
+
+
+# ── LOADING ──────────────────────────────────────────────────────
+@lru_cache(maxsize=1)
+def legal_records() -> tuple:
+    """
+    (CourtCaseTable, [NGO, ...]) built from the sample lists in data.legal_data;
+    the app reads these, not the dicts. The sample lists are small and stay as they
+    are. A real eCourts load should pass from_dicts an iterator over the source rows
+    (JSON lines, a DB cursor) so that no list of dicts is ever resident.
+    """
+    from data.legal_data import MOCK_COURT_CASES, NGOS
+    return CourtCaseTable.from_dicts(MOCK_COURT_CASES), [NGO.from_dict(d) for d in NGOS]
@@ -0,0 +1,332 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Hearing-date reminder scheduler
+#  One min-heap of (fire_at, subscription, offset) across all
+#  subscriptions, a pluggable sink, and a compact binary snapshot
+#  so the schedule survives restarts
+# ═══════════════════════════════════════════════════════════════
+
+import os
+import json
+import time
+import heapq
+import struct
+import asyncio
+import sqlite3
+from datetime import datetime, time as dtime, timedelta, timezone
+from typing import Optional
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MAX_OFFSETS = 16
+MAX_OFFSET_HOURS = 24 * 366        # fits the snapshot's uint32 with room to spare
+MAX_USER_ID_BYTES = 256            # snapshot stores string lengths as uint16
+
+
+# ── SINKS ────────────────────────────────────────────────────────
+class LogSink:
+    async def send(self, events: list):
+        for e in events:
+            print(f"Hearing reminder → {e['user_id']}: {e['case_number']} on {e['hearing_at']}")
+
+
+class OutboxSink:
+    """Appends reminders to an SQLite outbox table for another process to deliver."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with sqlite3.connect(path) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS reminder_outbox ("
+                "id INTEGER PRIMARY KEY, created_at REAL, user_id TEXT, payload TEXT, delivered INTEGER DEFAULT 0)"
+            )
+
+    def _write(self, events: list):
+        with sqlite3.connect(self.path) as db:
+            db.executemany(
+                "INSERT INTO reminder_outbox (created_at, user_id, payload) VALUES (?, ?, ?)",
+                [(time.time(), e["user_id"], json.dumps(e)) for e in events],
+            )
+
+    async def send(self, events: list):
+        await asyncio.to_thread(self._write, events)
+
+
+class WebhookSink:
+    """POSTs each batch of reminders as JSON to a (local) webhook."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    async def send(self, events: list):
+        import httpx
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.post(self.url, json={"reminders": events})
+            resp.raise_for_status()
+
+
+def sink_from_env(spec: str):
+    """log | outbox:<sqlite path> | webhook:<url>"""
+    kind, _, arg = spec.partition(":")
+    if kind == "outbox":
+        return OutboxSink(arg or "reminder_outbox.db")
+    if kind == "webhook":
+        return WebhookSink(arg)
+    return LogSink()
+
+
+# ── SCHEDULER ────────────────────────────────────────────────────
+class Subscription:
+    __slots__ = ("id", "user_id", "case_number", "hearing_ordinal", "offsets", "fired_mask")
+
+    def __init__(self, id, user_id, case_number, hearing_ordinal, offsets, fired_mask=0):
+        self.id = id
+        self.user_id = user_id
+        self.case_number = case_number
+        self.hearing_ordinal = hearing_ordinal
+        self.offsets = tuple(offsets)       # hours before the hearing
+        self.fired_mask = fired_mask        # bit i set → offsets[i] already sent
+
+
+class ReminderScheduler:
+    # snapshot: header (magic, version, next_id, count), then per subscription
+    # (id, hearing ordinal, fired mask, #offsets, len(user), len(case)) + offsets + utf-8 strings
+    MAGIC = b"JRM1"
+    HEADER = struct.Struct("<4sHQI")
+    RECORD = struct.Struct("<QiHBHH")
+
+    def __init__(self, lookup_case, sink, path: Optional[str] = None, hearing_time: dtime = dtime(10, 0)):
+        self.lookup_case = lookup_case     # case_number → CourtCase or None
+        self.sink = sink
+        self.path = path
+        self.hearing_time = hearing_time
+        self.subs: dict[int, Subscription] = {}
+        self._by_user: dict[str, dict[int, Subscription]] = {}     # user_id → their subscriptions, by id
+        self._heap: list = []              # (fire_at epoch, sub id, offset index)
+        self._next_id = 1
+        self._dirty = False
+        self._wake = asyncio.Event()
+        self.dispatched = 0
+        self.failed_batches = 0
+
+    def hearing_at(self, ordinal: int) -> datetime:
+        return datetime.combine(datetime.fromordinal(ordinal).date(), self.hearing_time, tzinfo=IST)
+
+    def _schedule(self, sub: Subscription, now: float):
+        hearing = self.hearing_at(sub.hearing_ordinal).timestamp()
+        for i, hours in enumerate(sub.offsets):
+            if sub.fired_mask & (1 << i):
+                continue
+            fire_at = hearing - hours * 3600
+            if fire_at <= now:
+                sub.fired_mask |= 1 << i   # too late for this one; never send stale reminders
+                continue
+            heapq.heappush(self._heap, (fire_at, sub.id, i))
+
+    # ── public API ────────────────────────────────────────────────
+    def subscribe(self, user_id: str, case_number: str, offsets_hours: list) -> Subscription:
+        if not user_id or len(user_id.encode()) > MAX_USER_ID_BYTES:
+            raise ValueError(f"user_id must be 1-{MAX_USER_ID_BYTES} bytes")
+        if any(not 0 <= int(h) <= MAX_OFFSET_HOURS for h in offsets_hours):
+            raise ValueError(f"Offsets must be between 0 and {MAX_OFFSET_HOURS} hours")
+        case = self.lookup_case(case_number)
+        if case is None:
+            raise KeyError(case_number)
+        if not case.next_hearing:
+            raise ValueError(f"Case {case.case_number} has no upcoming hearing")
+        offsets = sorted({int(h) for h in offsets_hours}, reverse=True)[:MAX_OFFSETS]
+        if not offsets:
+            raise ValueError("At least one offset (hours) is required")
+        sub = Subscription(self._next_id, user_id, case.case_number, case.next_hearing, offsets)
+        self._schedule(sub, time.time())
+        if self._finished(sub):
+            raise ValueError(f"All reminder times before the {case.case_number} hearing have passed")
+        self._next_id += 1
+        self._add(sub)
+        self._dirty = True
+        self._wake.set()
+        return sub
+
+    def unsubscribe(self, sub_id: int) -> bool:
+        # heap entries for it are skipped lazily when they come due
+        removed = self._remove(sub_id)
+        self._dirty |= removed
+        return removed
+
+    def _add(self, sub: Subscription):
+        self.subs[sub.id] = sub
+        self._by_user.setdefault(sub.user_id, {})[sub.id] = sub
+
+    def _remove(self, sub_id: int) -> bool:
+        sub = self.subs.pop(sub_id, None)
+        if sub is None:
+            return False
+        mine = self._by_user[sub.user_id]
+        del mine[sub_id]
+        if not mine:
+            del self._by_user[sub.user_id]
+        return True
+
+    @staticmethod
+    def _finished(sub: Subscription) -> bool:
+        return sub.fired_mask == (1 << len(sub.offsets)) - 1
+
+    def pending_times(self, sub: Subscription) -> list:
+        hearing = self.hearing_at(sub.hearing_ordinal)
+        return [
+            (hearing - timedelta(hours=h)).isoformat()
+            for i, h in enumerate(sub.offsets) if not sub.fired_mask & (1 << i)
+        ]
+
+    def for_user(self, user_id: str) -> list:
+        return list(self._by_user.get(user_id, {}).values())
+
+    # ── dispatch loop ─────────────────────────────────────────────
+    def _due(self, now: float, limit: int = 1000) -> tuple:
+        entries, events = [], []
+        while self._heap and self._heap[0][0] <= now and len(events) < limit:
+            fire_at, sub_id, i = heapq.heappop(self._heap)
+            sub = self.subs.get(sub_id)
+            if sub is None or sub.fired_mask & (1 << i):
+                continue
+            entries.append((fire_at, sub_id, i))
+            case = self.lookup_case(sub.case_number)
+            events.append({
+                "subscription_id": sub.id,
+                "user_id": sub.user_id,
+                "case_number": sub.case_number,
+                "court": case.court if case else None,
+                "hearing_at": self.hearing_at(sub.hearing_ordinal).isoformat(),
+                "hours_before": sub.offsets[i],
+                "fire_at": datetime.fromtimestamp(fire_at, IST).isoformat(),
+            })
+        return entries, events
+
+    def _mark_sent(self, entries: list):
+        for _, sub_id, i in entries:
+            sub = self.subs.get(sub_id)
+            if sub is None:
+                continue
+            sub.fired_mask |= 1 << i
+            if self._finished(sub):
+                self._remove(sub_id)
+        self._dirty = True
+
+    async def run(self, snapshot_every: float = 5.0, retry_after: float = 30.0):
+        """Dispatch loop. The scheduler is not thread-safe: mutate it only from this event loop."""
+        last_snapshot = time.monotonic()
+        while True:
+            try:
+                last_snapshot = await self._tick(snapshot_every, retry_after, last_snapshot)
+            except Exception as e:
+                print(f"Reminder scheduler error: {e!r}")
+                await asyncio.sleep(1)
+
+    async def _tick(self, snapshot_every: float, retry_after: float, last_snapshot: float) -> float:
+        while True:
+            entries, events = self._due(time.time())
+            if not events:
+                break
+            try:
+                await self.sink.send(events)
+            except Exception as e:
+                self.failed_batches += 1
+                print(f"Reminder sink failed for {len(events)} reminders, retrying in {retry_after}s: {e}")
+                for _, sub_id, i in entries:
+                    heapq.heappush(self._heap, (time.time() + retry_after, sub_id, i))
+            else:
+                self._mark_sent(entries)
+                self.dispatched += len(events)
+
+        if self._dirty and self.path and time.monotonic() - last_snapshot >= snapshot_every:
+            # only the list copy happens on the loop; encoding millions of subscriptions
+            # would stall every request on this worker, so it runs on the thread with the write
+            self._dirty = False
+            view = list(self.subs.values())
+            try:
+                await asyncio.to_thread(self._persist, self._next_id, view)
+            except Exception:
+                self._dirty = True
+                raise
+            last_snapshot = time.monotonic()
+
+        timeout = snapshot_every
+        if self._heap:
+            timeout = min(timeout, max(0.0, self._heap[0][0] - time.time()))
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return last_snapshot
+
+    # ── persistence ───────────────────────────────────────────────
+    def snapshot(self) -> bytes:
+        self._dirty = False
+        return b"".join(self._encode(self._next_id, list(self.subs.values())))
+
+    def _encode(self, next_id: int, subs: list, chunk: int = 10000):
+        # Safe off the loop: the list is a copy, and a subscription only ever gains fired bits.
+        # Yields a few hundred KB at a time; one join over millions of parts would hold the GIL
+        # (and stall the loop) for its whole run.
+        yield self.HEADER.pack(self.MAGIC, 1, next_id, len(subs))
+        for start in range(0, len(subs), chunk):
+            parts = []
+            for s in subs[start:start + chunk]:
+                user, case = s.user_id.encode(), s.case_number.encode()
+                parts.append(self.RECORD.pack(s.id, s.hearing_ordinal, s.fired_mask, len(s.offsets),
+                                              len(user), len(case)))
+                parts.append(struct.pack(f"<{len(s.offsets)}I", *s.offsets))
+                parts.append(user)
+                parts.append(case)
+            yield b"".join(parts)
+
+    def _persist(self, next_id: int, subs: list):
+        self._write(self._encode(next_id, subs))
+
+    def _write(self, chunks):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            for data in chunks:
+                f.write(data)
+        os.replace(tmp, self.path)
+
+    def save(self):
+        if self.path:
+            self._dirty = False
+            self._persist(self._next_id, list(self.subs.values()))
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        magic, version, next_id, count = self.HEADER.unpack_from(data, 0)
+        if magic != self.MAGIC or version != 1:
+            print(f"Ignoring unrecognised reminder snapshot {self.path}")
+            return
+        pos = self.HEADER.size
+        now = time.time()
+        for _ in range(count):
+            sub_id, ordinal, mask, n, ulen, clen = self.RECORD.unpack_from(data, pos)
+            pos += self.RECORD.size
+            offsets = struct.unpack_from(f"<{n}I", data, pos)
+            pos += 4 * n
+            user = data[pos:pos + ulen].decode()
+            pos += ulen
+            case = data[pos:pos + clen].decode()
+            pos += clen
+            sub = Subscription(sub_id, user, case, ordinal, offsets, mask)
+            self._schedule(sub, now)
+            if self._finished(sub):
+                self._dirty = True          # every reminder fell due while we were down
+                continue
+            self._add(sub)
+        self._next_id = max(self._next_id, next_id)
+
+    def stats(self) -> dict:
+        return {
+            "subscriptions": len(self.subs),
+            "pending": len(self._heap),
+            "dispatched": self.dispatched,
+            "failed_batches": self.failed_batches,
+            "next_fire_at": datetime.fromtimestamp(self._heap[0][0], IST).isoformat() if self._heap else None,
+        }
@@ -0,0 +1,195 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Resilience layer around the Claude call
+#  Latency-based circuit breaker, hedged retries, tail budget
+# ═══════════════════════════════════════════════════════════════
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the breaker is open."""
+
+
+# ── LATENCY TRACKER ──────────────────────────────────────────────
+class LatencyTracker:
+    """Rolling window of successful call latencies (seconds)."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def __len__(self):
+        return len(self._samples)
+
+
+# ── CIRCUIT BREAKER ──────────────────────────────────────────────
+class CircuitBreaker:
+    """
+    closed    → calls go upstream; N consecutive slow/failed calls trip it
+    open      → calls go straight to fallback until the cool-down expires
+    half_open → one probe call decides whether to close or re-open
+    """
+
+    def __init__(self, failure_threshold: int = 5, slow_call_s: float = 10.0, cooldown_s: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.slow_call_s = slow_call_s
+        self.cooldown_s = cooldown_s
+        self.state = "closed"
+        self.consecutive_bad = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._probe_started = 0.0
+        self._probe_inflight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.cooldown_s:
+                    self.rejected += 1
+                    return False
+                self.state = "half_open"
+            if self.state == "half_open":
+                # a probe that never reported back (client went away) expires after one cool-down
+                if self._probe_inflight and time.monotonic() - self._probe_started < self.cooldown_s:
+                    self.rejected += 1
+                    return False
+                self._probe_inflight = True
+                self._probe_started = time.monotonic()
+            return True
+
+    def record(self, seconds: float, ok: bool):
+        bad = not ok or seconds >= self.slow_call_s
+        with self._lock:
+            was_probe = self.state == "half_open"
+            self._probe_inflight = False
+            if not bad:
+                self.consecutive_bad = 0
+                self.state = "closed"
+                return
+            self.consecutive_bad += 1
+            if was_probe or self.consecutive_bad >= self.failure_threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self.state == "open":
+                retry_in = max(0.0, self.cooldown_s - (time.monotonic() - self.opened_at))
+            return {
+                "state": self.state,
+                "consecutive_bad_calls": self.consecutive_bad,
+                "failure_threshold": self.failure_threshold,
+                "slow_call_ms": round(self.slow_call_s * 1000),
+                "retry_in_s": round(retry_in, 1),
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+
+# ── GUARDED CALL ─────────────────────────────────────────────────
+class Resilience:
+    """
+    Wraps a blocking upstream call: breaker check, optional hedged retry once the
+    primary attempt passes the observed p95, and a hard per-request latency budget.
+    Attempts run on worker threads; a losing or timed-out attempt is abandoned, not killed.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, budget_s: float = 20.0, hedge: bool = True,
+                 hedge_min_samples: int = 20, hedge_floor_s: float = 1.0):
+        self.breaker = breaker
+        self.latency = LatencyTracker()
+        self.budget_s = budget_s
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_floor_s = hedge_floor_s
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+
+    def hedge_deadline(self) -> Optional[float]:
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_floor_s, self.latency.percentile(95))
+
+    async def run(self, fn: Callable[[], Any]) -> Any:
+        if not self.breaker.allow():
+            raise CircuitOpenError("Claude circuit is open")
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self._hedged(fn), timeout=self.budget_s)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.record(time.monotonic() - start, ok=False)
+            raise
+        except Exception:
+            self.breaker.record(time.monotonic() - start, ok=False)
+            raise
+        elapsed = time.monotonic() - start
+        self.latency.add(elapsed)
+        self.breaker.record(elapsed, ok=True)
+        return result
+
+    async def _hedged(self, fn: Callable[[], Any]) -> Any:
+        primary = asyncio.ensure_future(asyncio.to_thread(fn))
+        deadline = self.hedge_deadline()
+        if deadline is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=deadline)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        backup = asyncio.ensure_future(asyncio.to_thread(fn))
+        pending = {primary, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def record_stream(self, first_token_s: float, ok: bool):
+        """Streaming calls are judged on time-to-first-token (kept out of the hedge p95)."""
+        self.breaker.record(first_token_s, ok)
+
+    def snapshot(self) -> dict:
+        p95 = self.latency.percentile(95)
+        return {
+            **self.breaker.snapshot(),
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "budget_ms": round(self.budget_s * 1000),
+            "hedging": self.hedge,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+        }
@@ -0,0 +1,180 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Bulk legal-aid eligibility screening
+#  Streams a CSV / NDJSON upload in fixed-size batches, evaluates
+#  each batch in one vectorised pass and streams NDJSON results back
+# ═══════════════════════════════════════════════════════════════
+
+import csv
+import json
+import math
+import codecs
+import functools
+from typing import AsyncIterator, Iterator, Optional
+
+from data.legal_data import STATES
+
+# Section 12, Legal Services Authorities Act, 1987 — eligible regardless of income
+CATEGORY_ELIGIBLE = {
+    "sc", "st", "woman", "child", "disabled", "trafficking_victim", "industrial_workman",
+    "in_custody", "disaster_victim", "mental_illness",
+}
+# How intake sheets actually spell them (after lower-casing, spaces/hyphens → "_")
+CATEGORY_ALIASES = {
+    "women": "woman", "female": "woman", "girl": "child", "children": "child", "minor": "child",
+    "sc/st": "sc", "st/sc": "sc", "scheduled_caste": "sc", "scheduled_tribe": "st",
+    "disability": "disabled", "pwd": "disabled", "differently_abled": "disabled", "handicapped": "disabled",
+    "trafficking": "trafficking_victim", "trafficked": "trafficking_victim",
+    "industrial_worker": "industrial_workman", "workman": "industrial_workman",
+    "custody": "in_custody", "prisoner": "in_custody", "undertrial": "in_custody",
+    "disaster": "disaster_victim", "mentally_ill": "mental_illness",
+}
+# Recognised, but not eligible by category alone
+CATEGORY_GENERAL = {"", "general", "obc", "none", "na", "n/a", "other", "man", "male"}
+MAX_LINE_CHARS = 64 * 1024
+NALSA = {
+    "name": "NALSA (National Legal Services Authority)",
+    "phone": "15100",
+    "url": "https://nalsa.gov.in",
+}
+NATIONAL_INCOME_LIMIT = 300000
+
+STATE_IDS = list(STATES)
+AUTHORITIES = [
+    {"name": STATES[s]["legal_aid_authority"], "phone": STATES[s]["legal_aid_phone"], "url": STATES[s]["legal_aid_url"]}
+    for s in STATE_IDS
+] + [NALSA]
+_STATE_INDEX = {s: i for i, s in enumerate(STATE_IDS)}
+_UNKNOWN = len(STATE_IDS)
+
+
+# ── PARSING (incremental) ────────────────────────────────────────
+async def _lines(chunks: AsyncIterator[bytes], max_chars: int = MAX_LINE_CHARS) -> AsyncIterator[Optional[str]]:
+    """Lines of the upload; a line longer than max_chars is discarded and yields None."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buf = ""
+    skipping = False        # inside an over-long line: drop input until its newline
+    async for chunk in chunks:
+        buf += decoder.decode(chunk)
+        *complete, buf = buf.split("\n")
+        for line in complete:
+            if skipping or len(line) > max_chars:
+                skipping = False
+                yield None
+            else:
+                yield line.rstrip("\r")
+        if len(buf) > max_chars:
+            buf = ""
+            skipping = True
+    buf += decoder.decode(b"", final=True)
+    if skipping:
+        yield None
+    elif buf.strip():
+        yield buf.rstrip("\r")
+
+
+async def _rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[dict]:
+    header = None
+    async for line in _lines(chunks):
+        if line is None:
+            yield {"_error": "line_too_long"}
+            continue
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            fields = next(csv.reader([line]))
+            if header is None:
+                header = [h.strip().lower() for h in fields]
+                continue
+            yield dict(zip(header, fields))
+        else:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield row if isinstance(row, dict) else {}
+
+
+# ── EVALUATION (vectorised per batch) ────────────────────────────
+def _income(row: dict) -> float:
+    value = row.get("annual_income", row.get("income"))
+    try:
+        return float(str(value).replace(",", "")) if value not in (None, "") else math.nan
+    except ValueError:
+        return math.nan
+
+
+@functools.lru_cache(maxsize=None)
+def state_limits():
+    """Income limit per STATE_IDS index, national limit last (built on first screening)."""
+    import numpy as np
+    return np.array([STATES[s]["income_limit_legal_aid"] for s in STATE_IDS] + [NATIONAL_INCOME_LIMIT],
+                    dtype=np.float64)
+
+
+def _category(row: dict) -> str:
+    value = str(row.get("category") or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return CATEGORY_ALIASES.get(value, value)
+
+
+def evaluate_batch(rows: list, first_row: int) -> Iterator[dict]:
+    import numpy as np      # only the screening endpoint needs it; keeps it out of app start-up
+    income = np.array([_income(r) for r in rows], dtype=np.float64)
+    state_idx = np.array([_STATE_INDEX.get(str(r.get("state", "")).strip().lower(), _UNKNOWN) for r in rows])
+    category = np.array([_category(r) for r in rows])
+
+    by_category = np.isin(category, list(CATEGORY_ELIGIBLE))
+    by_income = income <= state_limits()[state_idx]        # NaN compares False
+    eligible = by_category | by_income
+    invalid = np.isnan(income) & ~by_category
+    unknown_category = ~by_category & ~np.isin(category, list(CATEGORY_GENERAL))
+
+    for i, row in enumerate(rows):
+        out = {
+            "row": first_row + i,
+            "state": row.get("state"),
+            "case_type": row.get("case_type"),
+            "eligible": bool(eligible[i]),
+        }
+        if "_error" in row:
+            out["eligible"] = False
+            out["reason"] = row["_error"]
+        elif by_category[i]:
+            out["reason"] = f"category:{category[i]}"
+        elif invalid[i]:
+            out["reason"] = "missing_or_invalid_income"
+        elif unknown_category[i] and not by_income[i]:
+            # may well be eligible under a category we don't recognise; needs a human look
+            out["reason"] = "unknown_category"
+            out["category"] = row.get("category")
+        else:
+            out["reason"] = "income_within_limit" if by_income[i] else "income_above_limit"
+        if eligible[i]:
+            out["authority"] = AUTHORITIES[state_idx[i]]
+        yield out
+
+
+async def screen(chunks: AsyncIterator[bytes], fmt: str, batch_size: int = 2000) -> AsyncIterator[str]:
+    """
+    NDJSON result lines, emitted batch by batch as the upload is read,
+    followed by one summary line. Memory is bounded by batch_size rows.
+    """
+    total = eligible = 0
+    batch = []
+
+    def flush():
+        nonlocal total, eligible
+        for out in evaluate_batch(batch, total + 1):
+            eligible += out["eligible"]
+            yield json.dumps(out, ensure_ascii=False) + "\n"
+        total += len(batch)
+        batch.clear()
+
+    async for row in _rows(chunks, fmt):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            for line in flush():
+                yield line
+    if batch:
+        for line in flush():
+            yield line
+    yield json.dumps({"summary": {"screened": total, "eligible": eligible, "not_eligible": total - eligible}}) + "\n"
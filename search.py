@@ -0,0 +1,169 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — BM25 full-text index over the legal data
+#  Acts, key rights, steps, required documents and deposit rules,
+#  used by /api/search and to ground chat prompts
+# ═══════════════════════════════════════════════════════════════
+
+import re
+import math
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Optional
+
+from data.legal_data import CASE_TYPES
+
+# Latin word characters plus the Indic script blocks (Devanagari … Malayalam),
+# so vowel signs and viramas stay inside their words
+TOKEN_RE = re.compile(r"[\w\u0900-\u0D7F]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "i", "if",
+    "in", "is", "it", "my", "of", "on", "or", "the", "their", "to", "was", "what", "when",
+    "with", "you", "your", "me", "can", "do", "does", "how", "not", "this", "that",
+}
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    for tok in TOKEN_RE.findall(text.lower()):
+        if tok in STOPWORDS:
+            continue
+        # crude English plural folding: deposits → deposit
+        if tok.isascii() and len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+
+# The corpus is English; Indic query words are looked up under their English terms
+QUERY_ALIASES = {
+    # Hindi
+    "किराया": "rent", "किराये": "rent", "किरायेदार": "tenant", "मकान": "landlord", "मालिक": "landlord",
+    "जमा": "deposit", "सुरक्षा": "security", "वापसी": "refund return", "ब्याज": "interest",
+    "वेतन": "salary wage", "मजदूरी": "wage", "तनख्वाह": "salary", "नियोक्ता": "employer",
+    "उपभोक्ता": "consumer", "उत्पाद": "product", "खराब": "defect", "रिफंड": "refund", "शिकायत": "complaint",
+    "घरेलू": "domestic", "हिंसा": "violence", "पति": "husband", "पुलिस": "police",
+    "अदालत": "court", "वकील": "lawyer", "नोटिस": "notice", "दस्तावेज़": "document", "दस्तावेज": "document",
+    # Tamil
+    "வாடகை": "rent", "வாடகைதாரர்": "tenant", "உரிமையாளர்": "landlord", "வைப்புத்தொகை": "deposit",
+    "முன்பணம்": "deposit", "ஊதியம்": "wage salary", "சம்பளம்": "salary", "முதலாளி": "employer",
+    "நுகர்வோர்": "consumer", "பொருள்": "product", "புகார்": "complaint", "வன்முறை": "violence",
+    "கணவர்": "husband", "காவல்": "police", "நீதிமன்றம்": "court", "வழக்கறிஞர்": "lawyer",
+    # Telugu
+    "అద్దె": "rent", "అద్దెదారు": "tenant", "యజమాని": "landlord employer", "డిపాజిట్": "deposit",
+    "జీతం": "salary", "వేతనం": "wage", "వినియోగదారు": "consumer", "ఉత్పత్తి": "product",
+    "ఫిర్యాదు": "complaint", "హింస": "violence", "భర్త": "husband", "పోలీసు": "police", "కోర్టు": "court",
+    # Bengali
+    "ভাড়া": "rent", "ভাড়াটে": "tenant", "বাড়িওয়ালা": "landlord", "জামানত": "deposit", "অগ্রিম": "deposit",
+    "বেতন": "salary", "মজুরি": "wage", "মালিক": "employer landlord", "ভোক্তা": "consumer", "পণ্য": "product",
+    "অভিযোগ": "complaint", "হিংসা": "violence", "নির্যাতন": "violence", "স্বামী": "husband",
+    "পুলিশ": "police", "আদালত": "court", "উকিল": "lawyer",
+}
+_ALIASES = {tok: tuple(tokenize(english)) for word, english in QUERY_ALIASES.items() for tok in tokenize(word)}
+
+
+def query_terms(text: str) -> set:
+    """tokenize(), plus the English terms of any aliased (Indic) words."""
+    terms = set()
+    for tok in tokenize(text):
+        terms.add(tok)
+        terms.update(_ALIASES.get(tok, ()))
+    return terms
+
+
+# ── SNIPPETS ─────────────────────────────────────────────────────
+DEPOSIT_RULE_TEXT = {
+    "residential_max_months": "Residential security deposit is capped at {} months' rent",
+    "commercial_max_months": "Commercial security deposit is capped at {} months' rent",
+    "return_days": "Landlord must return the deposit within {} days of the tenant vacating",
+    "interest_rate_percent": "Delayed deposit refund attracts {}% annual interest",
+}
+
+
+def build_snippets() -> list:
+    snippets = []
+
+    def add(case_type, field, text):
+        snippets.append({"case_type": case_type, "field": field, "text": text})
+
+    for ct_id, ct in CASE_TYPES.items():
+        for act in ct.get("primary_acts", []):
+            add(ct_id, "primary_acts", act)
+        for right in ct.get("key_rights", []):
+            add(ct_id, "key_rights", right)
+        for step in ct.get("steps", []):
+            add(ct_id, "steps", f"Step {step['step']} — {step['title']}: {step['description']}")
+        for doc in ct.get("required_documents", []):
+            add(ct_id, "required_documents", doc)
+        for rule, value in ct.get("deposit_rules", {}).items():
+            add(ct_id, "deposit_rules", DEPOSIT_RULE_TEXT.get(rule, rule + ": {}").format(value))
+    return snippets
+
+
+# ── INDEX ────────────────────────────────────────────────────────
+class BM25Index:
+    def __init__(self, snippets: list, k1: float = 1.5, b: float = 0.75):
+        self.snippets = snippets
+        self.k1, self.b = k1, b
+        self.postings = defaultdict(list)   # term → [(doc_id, tf), ...]
+        self.doc_len = []
+        for doc_id, snip in enumerate(snippets):
+            # the case type name is indexed with each snippet so "rent" finds rental steps
+            terms = tokenize(snip["text"] + " " + CASE_TYPES[snip["case_type"]]["name"])
+            self.doc_len.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings[term].append((doc_id, tf))
+        n = len(snippets)
+        self.avgdl = sum(self.doc_len) / n if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in self.postings.items()
+        }
+
+    def search(self, query: str, k: int = 5, case_type: Optional[str] = None) -> list:
+        scores = defaultdict(float)
+        for term in query_terms(query):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / self.avgdl)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        results = []
+        for doc_id, score in ranked:
+            snip = self.snippets[doc_id]
+            if case_type and snip["case_type"] != case_type:
+                continue
+            results.append({**snip, "score": round(score, 3)})
+            if len(results) == k:
+                break
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_index() -> BM25Index:
+    """Built on first search, not at import."""
+    return BM25Index(build_snippets())
+
+
+# What to ground a prompt with when the query itself matches nothing
+FALLBACK_FIELDS = ("key_rights", "steps", "deposit_rules", "primary_acts")
+
+
+def relevant_snippets(query: str, k: int = 4, case_type: Optional[str] = None,
+                      fallback_case_type: Optional[str] = None) -> list:
+    """
+    Top-k snippets for the query; if none match, the leading snippets of
+    fallback_case_type (usually the intent detected from the message).
+    """
+    index = get_index()
+    found = [r["text"] for r in index.search(query, k=k, case_type=case_type)]
+    if found or fallback_case_type not in CASE_TYPES:
+        return found
+    rank = {field: i for i, field in enumerate(FALLBACK_FIELDS)}
+    general = sorted(
+        (s for s in index.snippets if s["case_type"] == fallback_case_type and s["field"] in rank),
+        key=lambda s: rank[s["field"]],
+    )
+    return [s["text"] for s in general[:k]]
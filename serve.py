@@ -0,0 +1,151 @@
+"""
+╔══════════════════════════════════════════════════════════╗
+║          JUSTIA — Production launcher (prefork)          ║
+║  Run:  python serve.py --workers 4 --port 8000           ║
+╚══════════════════════════════════════════════════════════╝
+
+Loads the app (and all read-only legal data) once in the parent, then
+forks N uvicorn workers that share those pages copy-on-write. Mutable
+caches go through a shared store on a local Unix socket (see cache.py).
+Hearing reminders keep their schedule in one process, so the reminder
+API answers 409 unless --workers is 1.
+Linux/macOS only — relies on os.fork().
+"""
+
+import os
+import gc
+import sys
+import socket
+import time
+import signal
+import argparse
+import shutil
+import tempfile
+import multiprocessing
+
+import uvicorn
+
+from cache import run_cache_server
+
+# A worker that dies sooner than this after starting is crash-looping: its next
+# restart waits 1s, 2s, 4s, ... up to RESTART_BACKOFF_MAX_S (reset by a healthy run)
+MIN_HEALTHY_UPTIME_S = 10.0
+RESTART_BACKOFF_MAX_S = 60.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="JUSTIA multi-worker server")
+    parser.add_argument("--host", default=os.getenv("JUSTIA_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("JUSTIA_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("JUSTIA_WORKERS", "0")) or os.cpu_count() or 1)
+    return parser.parse_args()
+
+
+def run_worker(sock: socket.socket, app):
+    # Children exit on SIGTERM/SIGINT via uvicorn's own handlers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # Chat deltas are a few bytes each; per-frame deflate costs more CPU than it saves
+    deflate = os.getenv("JUSTIA_WS_DEFLATE", "off") == "on"
+    server = uvicorn.Server(uvicorn.Config(app, log_level="info", ws_per_message_deflate=deflate))
+    server.run(sockets=[sock])
+    os._exit(0)
+
+
+def main():
+    args = parse_args()
+
+    # ── Shared cache tier (own process, Unix socket) ──────────────
+    cache_dir = tempfile.mkdtemp(prefix="justia-")
+    authkey = os.urandom(16)
+    os.environ["JUSTIA_CACHE_ADDR"] = os.path.join(cache_dir, "cache.sock")
+    os.environ["JUSTIA_CACHE_AUTHKEY"] = authkey.hex()
+    cache_server = multiprocessing.Process(
+        target=run_cache_server, args=(os.environ["JUSTIA_CACHE_ADDR"], authkey),
+        name="justia-cache", daemon=True,
+    )
+    cache_server.start()
+
+    # ── Preload before fork: read-only data is shared copy-on-write ─
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import main as justia
+    # Import the SDK once here too; each worker still builds its own client
+    if justia.ANTHROPIC_API_KEY:
+        import anthropic  # noqa: F401
+    # Move everything loaded so far out of the GC's reach so collections
+    # in the workers don't touch (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = {}
+    started_at = {}
+    crashes = {}            # slot → consecutive short-lived exits
+
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            os.environ["JUSTIA_WORKER_ID"] = str(slot)
+            os.environ["JUSTIA_WORKER_COUNT"] = str(args.workers)
+            run_worker(sock, justia.app)
+        children[pid] = slot
+        started_at[slot] = time.monotonic()
+
+    for slot in range(args.workers):
+        spawn(slot)
+    print(f"JUSTIA: {args.workers} workers on {args.host}:{args.port} (pid {os.getpid()})")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # ── Supervise: restart crashed workers until asked to stop ─────
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid == cache_server.pid:
+            print("JUSTIA: shared cache server exited; workers fall back to local caches")
+            continue
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        if time.monotonic() - started_at[slot] < MIN_HEALTHY_UPTIME_S:
+            crashes[slot] = crashes.get(slot, 0) + 1
+        else:
+            crashes[slot] = 0
+        delay = min(RESTART_BACKOFF_MAX_S, 2 ** (crashes[slot] - 1)) if crashes[slot] else 0
+        print(f"JUSTIA: worker {slot} (pid {pid}) exited with status {status}, restarting"
+              + (f" in {delay:.0f}s" if delay else ""))
+        deadline = time.monotonic() + delay
+        while not stopping and time.monotonic() < deadline:
+            time.sleep(max(0.0, min(0.5, deadline - time.monotonic())))
+        if not stopping:
+            spawn(slot)
+
+    if cache_server.is_alive():
+        cache_server.terminate()
+    sock.close()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
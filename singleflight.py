@@ -0,0 +1,136 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — Request coalescing (single-flight)
+#  Concurrent identical prompts share one upstream Claude call
+# ═══════════════════════════════════════════════════════════════
+
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Awaitable, Callable, Iterable, Optional
+
+
+def prompt_key(system: str, messages: list, model: str = "") -> str:
+    """Stable cache key for a (model, system prompt, message list) triple."""
+    payload = json.dumps([model, system, messages], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ── NON-STREAMING: one future per key ────────────────────────────
+class SingleFlight:
+    """
+    Deduplicates concurrent calls with the same key.
+    The first caller starts the coroutine as its own task; every caller, the
+    first included, awaits it through a shield, so any one of them being
+    cancelled (a client disconnecting) never cancels the shared call.
+    Nothing is cached after completion.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every waiter has gone
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "upstream_calls": self.calls, "coalesced": self.shared}
+
+
+# ── STREAMING: one upstream token stream, many subscribers ───────
+class Broadcast:
+    """Buffered token stream. Late joiners replay the prefix, then follow live."""
+
+    def __init__(self):
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def push(self, chunk: str):
+        self.chunks.append(chunk)
+        self._wake()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._wake()
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self):
+        """Block until the next push() or finish()."""
+        await self._changed.wait()
+
+    async def follow(self, start: int = 0):
+        pos = start
+        while True:
+            while pos < len(self.chunks):
+                yield self.chunks[pos]
+                pos += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self.wait()
+
+
+class StreamFlight:
+    """
+    Fans one upstream token stream out to every concurrent subscriber with the same key.
+    `open_stream` is a blocking iterable factory (the Anthropic SDK's sync text stream);
+    it is drained on a worker thread so the event loop keeps serving other requests.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, Broadcast] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def subscribe(self, key: str, open_stream: Callable[[], Iterable[str]]):
+        bc = self._inflight.get(key)
+        if bc is not None:
+            self.shared += 1
+            return bc.follow()
+
+        self.calls += 1
+        bc = Broadcast()
+        self._inflight[key] = bc
+        loop = asyncio.get_running_loop()
+
+        def pump():
+            error = None
+            try:
+                for text in open_stream():
+                    loop.call_soon_threadsafe(bc.push, text)
+            except Exception as e:
+                error = e
+            loop.call_soon_threadsafe(self._finish, key, bc, error)
+
+        threading.Thread(target=pump, name=f"stream-{key[:8]}", daemon=True).start()
+        return bc.follow()
+
+    def _finish(self, key: str, bc: Broadcast, error: Optional[BaseException]):
+        if self._inflight.get(key) is bc:
+            del self._inflight[key]
+        bc.finish(error)
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "upstream_calls": self.calls, "coalesced": self.shared}
@@ -0,0 +1,41 @@
+import pytest
+
+from answers import canonical_intent
+
+
+class Req:
+    def __init__(self, message, language="en", state="karnataka", case_type=None, history=()):
+        self.message = message
+        self.language = language
+        self.state = state
+        self.case_type = case_type
+        self.conversation_history = list(history)
+
+
+@pytest.mark.parametrize("language, message, intent", [
+    ("en", "What are my rights if the landlord keeps my deposit?", "rental_deposit"),
+    ("hi", "मकान मालिक मेरी सुरक्षा जमा राशि वापस नहीं कर रहा, मेरे अधिकार क्या हैं?", "rental_deposit"),
+    ("ta", "வீட்டு உரிமையாளர் என் வைப்புத்தொகையை திருப்பித் தரவில்லை, என் உரிமைகள் என்ன?", "rental_deposit"),
+    ("te", "ఇంటి యజమాని నా డిపాజిట్ తిరిగి ఇవ్వడం లేదు, నా హక్కులు ఏమిటి?", "rental_deposit"),
+    ("bn", "বাড়িওয়ালা আমার জামানত ফেরত দিচ্ছে না, আমার অধিকার কী?", "rental_deposit"),
+    ("hi", "पति की घरेलू हिंसा, मेरे अधिकार क्या हैं?", "domestic_violence"),
+])
+def test_generic_questions_reuse_in_every_language(language, message, intent):
+    assert canonical_intent(Req(message, language)) == intent
+
+
+@pytest.mark.parametrize("language, message", [
+    ("en", "My landlord wants me out next week"),
+    ("hi", "मकान मालिक मुझे अगले हफ्ते घर से निकालना चाहता है"),      # eviction, not the deposit question
+    ("hi", "मकान मालिक ने 50000 जमा नहीं लौटाया"),                     # specific amount
+    ("ta", "வீட்டு உரிமையாளர் வைப்புத்தொகையை மூன்று மாதமாக தரவில்லை"),  # unknown words stay off reuse
+])
+def test_specific_questions_go_to_the_model(language, message):
+    assert canonical_intent(Req(message, language)) is None
+
+
+def test_follow_ups_and_mismatched_case_types_never_reuse():
+    message = "मकान मालिक मेरी जमा राशि वापस नहीं कर रहा"
+    assert canonical_intent(Req(message, "hi")) == "rental_deposit"
+    assert canonical_intent(Req(message, "hi", history=[{"role": "user", "content": "hi"}])) is None
+    assert canonical_intent(Req(message, "hi", case_type="labour_wage")) is None
@@ -0,0 +1,20 @@
+from audit import store_from_env
+
+
+def test_log_query_reads_every_workers_segments(tmp_path):
+    first, second = store_from_env(f"log:{tmp_path}", "1"), store_from_env(f"log:{tmp_path}", "2")
+    first.segment_bytes = 300                   # rotate (and gzip) the first worker's log as it goes
+    for i in range(1, 11):
+        (first if i % 2 else second).write([(i, "chat", "s1", {"i": i}), (i, "chat", "s2", {"i": i})])
+    assert any(p.name.endswith(".gz") for p in tmp_path.iterdir())
+
+    assert [e["i"] for e in second.query("s1")] == list(range(1, 11))
+    assert [e["i"] for e in first.query("s2", since=3, limit=3)] == [4, 5, 6]
+
+
+def test_log_query_skips_a_batch_still_being_written(tmp_path):
+    store = store_from_env(f"log:{tmp_path}", "1")
+    store.write([(1, "chat", "s1", {})])
+    store._file.write(b'{"ts": 2, "kind": "chat", "session_id": "s1"')
+    store._file.flush()
+    assert [e["ts"] for e in store_from_env(f"log:{tmp_path}", "2").query("s1")] == [1]
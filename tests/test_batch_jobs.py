@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from batch_jobs import BatchFull, BatchItem, BatchJob, BatchRunner, page
+
+
+def job_with(delivered: list, total: int = 6) -> BatchJob:
+    job = BatchJob([], total)
+    for i in delivered:
+        item = BatchItem(f"k{i}", None, "system", [])
+        item.indexes.append(i)
+        job.deliver(item, f"reply {i}", "mock")
+    return job
+
+
+@pytest.mark.parametrize("offset, limit", [(0, None), (0, 2), (2, 2), (3, 10), (5, 1), (6, 3)])
+def test_snapshot_pages_like_the_owning_worker(offset, limit):
+    job = job_with([0, 3, 4])
+    snapshot = job.as_dict()                # what other workers read: completed results only
+    assert page(snapshot["results"], offset, limit) == job.as_dict(offset, limit)["results"]
+
+
+def test_page_is_by_submission_index():
+    job = job_with([0, 3, 4])
+    assert [r["index"] for r in job.as_dict(2, 2)["results"]] == [3]
+    assert [r["index"] for r in page(job.as_dict()["results"], 2, 2)] == [3]
+
+
+def test_check_refuses_before_any_work():
+    runner = BatchRunner(lambda: None, lambda item: "", max_pending=1, max_items=3)
+    with pytest.raises(ValueError):
+        runner.check(0)
+    with pytest.raises(ValueError):
+        runner.check(4)
+    runner.check(3)
+
+    async def fill():
+        await runner.submit([("k", None, "system", [])])
+        with pytest.raises(BatchFull):
+            runner.check(1)
+    asyncio.run(fill())
@@ -0,0 +1,82 @@
+import gzip
+import json
+import random
+
+import pytest
+
+from bundle import BundleStore, apply_delta, build_bundle, bundle_version, make_delta
+
+
+def edited(raw: bytes, seed: int, edits: int = 20) -> bytes:
+    rng = random.Random(seed)
+    data = bytearray(raw)
+    for _ in range(edits):
+        pos = rng.randrange(len(data))
+        kind = rng.random()
+        if kind < 0.4:
+            data[pos:pos] = rng.randbytes(rng.randrange(1, 40))
+        elif kind < 0.7:
+            del data[pos:pos + rng.randrange(1, 40)]
+        else:
+            data[pos:pos + 8] = rng.randbytes(8)
+    return bytes(data)
+
+
+@pytest.mark.parametrize("old,new", [
+    (b"", b""),
+    (b"", b"fresh content"),
+    (b"old content", b""),
+    (b"short", b"shorter"),
+    (b"x" * 1000, b"x" * 1000),
+    (b"abc" * 500, b"abc" * 200 + b"inserted" + b"abc" * 300),
+])
+def test_round_trip_edge_cases(old, new):
+    assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_round_trip_random_edits_of_real_bundle():
+    old = build_bundle(("en", "hi"))
+    for seed in range(10):
+        new = edited(old, seed)
+        assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_small_data_change_sends_a_small_delta():
+    old = build_bundle(("en",))
+    payload = json.loads(old)
+    state = next(iter(payload["states"].values()))
+    state["legal_aid_phone"] = "1800-000-0000"
+    new = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode()
+    delta = make_delta(old, new)
+    assert apply_delta(old, delta) == new
+    assert len(delta) < len(gzip.compress(new, 9)) / 20
+
+
+def test_rejects_foreign_deltas():
+    with pytest.raises(ValueError):
+        apply_delta(b"old", b"not a delta")
+
+
+def test_store_serves_deltas_from_a_previous_deploy(tmp_path):
+    old = build_bundle(("en",))
+    BundleStore(str(tmp_path))._remember(bundle_version(old), old)      # written by the last deploy
+
+    store = BundleStore(str(tmp_path))
+    version, raw, gz = store.current(("en", "hi"))
+    assert gzip.decompress(gz) == raw and version == bundle_version(raw)
+    assert store.current(("en", "hi"))[0] == version                  # built once
+    patch = store.delta(bundle_version(old), version, raw)
+    assert apply_delta(old, patch) == raw
+    assert store.delta(bundle_version(old), version, raw) is patch     # cached
+    assert store.delta("../../etc/passwd", version, raw) is None
+    assert store.delta("0" * 16, version, raw) is None
+
+
+def test_cross_origin_client_can_read_bundle_headers():
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(main.app) as client:
+        resp = client.get("/api/bundle", headers={"Origin": "http://localhost:5500"})
+    assert resp.status_code == 200
+    exposed = {h.strip().lower() for h in resp.headers["access-control-expose-headers"].split(",")}
+    assert {"etag", "x-bundle-version", "x-bundle-type", "x-bundle-base"} <= exposed
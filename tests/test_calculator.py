@@ -0,0 +1,81 @@
+import math
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from calculator import RULES, deposit_claim, deposit_claims_bulk
+
+AS_OF = date(2025, 6, 1)
+
+
+def random_records(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    records = []
+    for _ in range(n):
+        vacated = date(2019, 1, 1) + timedelta(days=rng.randrange(2300))
+        record = {"deposit_amount": rng.choice([5000, 25000.5, 60000, 150000]), "vacated_on": vacated}
+        if rng.random() < 0.4:
+            record["refunded_on"] = vacated + timedelta(days=rng.randrange(-10, 400))
+        if rng.random() < 0.4:
+            record["amount_refunded"] = rng.choice([0, 1000, 20000, 200000])
+        if rng.random() < 0.5:
+            record["monthly_rent"] = rng.choice([8000, 15000, 40000])
+        records.append(record)
+    return records
+
+
+def test_bulk_matches_single():
+    records = random_records(2000)
+    for record, bulk in zip(records, deposit_claims_bulk(records, as_of=AS_OF)):
+        assert bulk == deposit_claim(**record, as_of=AS_OF), record
+
+
+def test_leap_day_deadline():
+    # due date 29 Feb → limitation runs to 28 Feb in the non-leap year
+    vacated = date(2024, 2, 29) - timedelta(days=RULES["return_days"])
+    single = deposit_claim(10000, vacated, as_of=AS_OF)
+    assert single["due_date"] == "2024-02-29"
+    assert deposit_claims_bulk([{"deposit_amount": 10000, "vacated_on": vacated}], as_of=AS_OF)[0] == single
+
+
+def test_bulk_reports_invalid_rows_in_place():
+    results = deposit_claims_bulk([
+        {"deposit_amount": 10000, "vacated_on": "2024-01-01"},
+        {"deposit_amount": 0, "vacated_on": "2024-01-01"},
+        {"vacated_on": "2024-01-01"},
+        {"deposit_amount": 10000},
+    ], as_of=AS_OF)
+    assert "error" not in results[0]
+    assert all("error" in r for r in results[1:])
+
+
+def test_empty_and_bad_input():
+    assert deposit_claims_bulk([]) == []
+    with pytest.raises(ValueError):
+        deposit_claim(0, date(2024, 1, 1))
+
+
+@pytest.mark.parametrize("field", ["deposit_amount", "amount_refunded", "monthly_rent"])
+def test_single_rejects_non_finite(field):
+    args = {"deposit_amount": 10000.0, "vacated_on": date(2024, 1, 1), "monthly_rent": 5000.0, field: math.inf}
+    with pytest.raises(ValueError, match=field):
+        deposit_claim(**args, as_of=AS_OF)
+
+
+def test_bulk_reports_bad_values_per_row():
+    good = {"deposit_amount": 10000, "vacated_on": "2024-01-01"}
+    results = deposit_claims_bulk([
+        good,
+        {"deposit_amount": math.inf, "vacated_on": "2024-01-01"},
+        {"deposit_amount": "nan", "vacated_on": "2024-01-01"},
+        {"deposit_amount": 10000, "vacated_on": 12345},              # not days since the epoch
+        {"deposit_amount": 10000, "vacated_on": "2025-02-30"},
+        {"deposit_amount": 10000, "vacated_on": "2024-01-01", "monthly_rent": True},
+        good,
+    ], as_of=AS_OF)
+    assert results[0] == results[-1] == deposit_claim(10000, date(2024, 1, 1), as_of=AS_OF)
+    assert [r["error"].split(":")[0] for r in results[1:-1]] == [
+        "Invalid deposit_amount", "Invalid deposit_amount", "Invalid vacated_on",
+        "Invalid vacated_on", "Invalid monthly_rent",
+    ]
@@ -0,0 +1,91 @@
+import io
+import threading
+import time
+import zipfile
+
+import pytest
+
+import documents
+from data.legal_data import STATES
+from documents import DocumentError, render_batch, render_document
+
+FACTS = {
+    "tenant_name": "Asha Rao", "tenant_address": "12 MG Road, Bengaluru",
+    "landlord_name": "R. Kumar", "landlord_address": "4 Brigade Road, Bengaluru",
+    "property_address": "Flat 3B, 12 MG Road", "deposit_amount": "150000",
+    "vacated_on": "2024-03-31", "date": "2024-05-01",
+}
+
+
+def item(**overrides) -> dict:
+    return {"case_type": "rental_deposit", "state": "karnataka", "facts": FACTS, **overrides}
+
+
+def test_render_fills_user_and_state_facts():
+    page = render_document("rental_deposit", "karnataka", "en", FACTS).decode()
+    assert "Asha Rao" in page and "Flat 3B, 12 MG Road" in page
+    assert "150,000" in page                      # amounts are formatted
+    assert STATES["karnataka"]["rent_act"] in page
+    assert "$" not in page                        # no placeholder left unfilled
+
+
+def test_missing_facts_are_listed():
+    facts = dict(FACTS, tenant_name="")
+    del facts["vacated_on"]
+    with pytest.raises(DocumentError, match="Missing facts: tenant_name, vacated_on"):
+        render_document("rental_deposit", "karnataka", "en", facts)
+
+
+def test_amount_must_be_a_number():
+    with pytest.raises(DocumentError, match="'deposit_amount' must be a number"):
+        render_document("rental_deposit", "karnataka", "en", dict(FACTS, deposit_amount="lots"))
+
+
+@pytest.mark.parametrize("case_type, state", [("divorce", "karnataka"), ("rental_deposit", "atlantis")])
+def test_unknown_combination(case_type, state):
+    with pytest.raises(DocumentError):
+        render_document(case_type, state, "en", FACTS)
+
+
+def test_batch_zip_layout():
+    items = [item(), item(facts=dict(FACTS, deposit_amount="lots")), item(format="pdf"),
+             item(state="atlantis")]
+    data, rendered = render_batch(items)
+    assert rendered == 2
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.namelist() == ["00001_rental_deposit_karnataka.html",
+                                 "00003_rental_deposit_karnataka.pdf", "errors.txt"]
+        assert zf.read("00003_rental_deposit_karnataka.pdf").startswith(b"%PDF")
+        errors = zf.read("errors.txt").decode().splitlines()
+    assert [e.split(":")[0] for e in errors] == ["2", "4"]
+    assert "must be a number" in errors[0]
+
+
+def test_concurrent_batches_share_one_pool(monkeypatch):
+    created = []
+
+    class SlowPool:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)                      # widen the window between check and assign
+            created.append(self)
+
+        def shutdown(self, cancel_futures=False):
+            self.closed = True
+
+    monkeypatch.setattr(documents, "ProcessPoolExecutor", SlowPool)
+    monkeypatch.setattr(documents, "_pool", None)
+    barrier = threading.Barrier(4)
+    got = []
+
+    def worker():
+        barrier.wait()
+        got.append(documents._get_pool())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(created) == 1 and all(p is created[0] for p in got)
+    documents.shutdown_pool()
+    assert created[0].closed and documents._pool is None
@@ -0,0 +1,23 @@
+from fastapi.testclient import TestClient
+
+from records import NGO, legal_records
+
+
+def test_legal_records_leave_the_source_module_alone():
+    cases, ngos = legal_records()
+    from data.legal_data import MOCK_COURT_CASES, NGOS
+    assert len(cases) == len(MOCK_COURT_CASES)
+    assert [n.as_dict() for n in ngos] == [NGO.from_dict(d).as_dict() for d in NGOS]
+    first = MOCK_COURT_CASES[0]
+    assert cases.get(first["case_number"].lower()).as_dict()["next_hearing"] == first["next_hearing"]
+
+
+def test_find_ngos_endpoint():
+    import main
+    with TestClient(main.app) as client:
+        resp = client.post("/api/ngos", json={"state": "karnataka", "case_type": "rental_deposit"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert 1 <= len(body["ngos"]) <= 5
+    assert body["total_found"] >= len(body["ngos"])
+    assert all({"name", "phone", "focus", "states"} <= set(n) for n in body["ngos"])
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+import reminders
+from reminders import MAX_OFFSET_HOURS, ReminderScheduler
+
+TODAY = date.today()
+
+
+class Case:
+    def __init__(self, case_number, days_ahead):
+        self.case_number = case_number
+        self.court = "District Court"
+        self.next_hearing = (TODAY + timedelta(days=days_ahead)).toordinal() if days_ahead is not None else 0
+
+
+CASES = {c.case_number: c for c in (Case("CC/1/2024", 30), Case("CC/2/2024", 5), Case("CC/3/2024", None))}
+
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    async def send(self, events):
+        self.events.extend(events)
+
+
+def scheduler(tmp_path, sink=None):
+    return ReminderScheduler(CASES.get, sink or ListSink(), path=str(tmp_path / "reminders.bin"))
+
+
+def test_snapshot_round_trip(tmp_path):
+    s = scheduler(tmp_path)
+    a = s.subscribe("पूजा@example.in", "CC/1/2024", [24, 168, 24])
+    b = s.subscribe("u2", "CC/2/2024", [1, 48, 24 * 10])     # 10 days before is already past
+    s.unsubscribe(s.subscribe("gone", "CC/1/2024", [1]).id)
+    s.save()
+
+    restored = scheduler(tmp_path)
+    restored.load()
+    assert sorted(restored.subs) == [a.id, b.id]
+    for sub in (a, b):
+        got = restored.subs[sub.id]
+        assert (got.user_id, got.case_number, got.hearing_ordinal, got.offsets, got.fired_mask) == \
+               (sub.user_id, sub.case_number, sub.hearing_ordinal, sub.offsets, sub.fired_mask)
+    assert a.offsets == (168, 24) and b.fired_mask == 0b001
+    assert len(restored._heap) == len(s._heap) - 1                       # "gone" is not rescheduled
+    assert restored.subscribe("u3", "CC/1/2024", [2]).id > b.id + 1      # ids are never reused
+
+
+def test_load_drops_subscriptions_that_fell_due_while_down(tmp_path, monkeypatch):
+    s = scheduler(tmp_path)
+    s.subscribe("u1", "CC/2/2024", [24])
+    s.subscribe("u2", "CC/1/2024", [24])
+    s.save()
+    now = reminders.time.time()
+    monkeypatch.setattr(reminders.time, "time", lambda: now + 10 * 86400)
+    restored = scheduler(tmp_path)
+    restored.load()
+    assert [sub.user_id for sub in restored.subs.values()] == ["u2"]
+    assert restored._dirty
+
+
+def test_dispatch_fires_each_offset_once(tmp_path, monkeypatch):
+    sink = ListSink()
+    s = scheduler(tmp_path, sink)
+    sub = s.subscribe("u1", "CC/2/2024", [48, 24])
+    hearing = s.hearing_at(sub.hearing_ordinal).timestamp()
+    for at, fired in ((hearing - 49 * 3600, 0), (hearing - 47 * 3600, 1), (hearing - 1, 2), (hearing + 3600, 2)):
+        monkeypatch.setattr(reminders.time, "time", lambda: at)
+        asyncio.run(s._tick(0, 30, 0))
+        assert len(sink.events) == fired
+    assert [e["hours_before"] for e in sink.events] == [48, 24]
+    assert sub.id not in s.subs                                          # finished ⇒ dropped
+
+
+def test_subscribe_validation(tmp_path):
+    s = scheduler(tmp_path)
+    with pytest.raises(KeyError):
+        s.subscribe("u", "NOPE", [24])
+    with pytest.raises(ValueError):
+        s.subscribe("u", "CC/3/2024", [24])                            # no upcoming hearing
+    with pytest.raises(ValueError):
+        s.subscribe("u", "CC/1/2024", [MAX_OFFSET_HOURS + 1])
+    with pytest.raises(ValueError):
+        s.subscribe("x" * 300, "CC/1/2024", [24])
+    with pytest.raises(ValueError):
+        s.subscribe("u", "CC/1/2024", [24 * 60])                       # every reminder already past
+
+
+def test_for_user_tracks_subscribe_unsubscribe_and_finish(tmp_path, monkeypatch):
+    s = scheduler(tmp_path)
+    a = s.subscribe("u1", "CC/1/2024", [24])
+    b = s.subscribe("u1", "CC/2/2024", [24])
+    s.subscribe("u2", "CC/1/2024", [24])
+    assert s.for_user("u1") == [a, b] and s.for_user("nobody") == []
+    s.unsubscribe(a.id)
+    assert s.for_user("u1") == [b]
+    monkeypatch.setattr(reminders.time, "time", lambda: s.hearing_at(b.hearing_ordinal).timestamp())
+    asyncio.run(s._tick(0, 30, 0))
+    assert s.for_user("u1") == [] and "u1" not in s._by_user
+
+
+def test_tick_persists_the_same_bytes_as_snapshot(tmp_path):
+    s = scheduler(tmp_path)
+    s.subscribe("u1", "CC/1/2024", [24, 2])
+    s.subscribe("u2", "CC/2/2024", [1])
+    asyncio.run(s._tick(0, 30, 0))
+    assert not s._dirty
+    with open(s.path, "rb") as f:
+        assert f.read() == s.snapshot()
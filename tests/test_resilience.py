@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, Resilience
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record(0.1, ok=False)
+
+
+def test_trips_after_consecutive_bad_calls(clock):
+    breaker = CircuitBreaker(failure_threshold=3, slow_call_s=1.0, cooldown_s=30)
+    breaker.record(0.1, ok=False)
+    breaker.record(0.1, ok=False)
+    breaker.record(0.1, ok=True)            # a good call resets the streak
+    assert breaker.state == "closed" and breaker.consecutive_bad == 0
+    breaker.record(0.1, ok=False)
+    breaker.record(5.0, ok=True)            # slow counts as bad
+    assert breaker.state == "closed"
+    breaker.record(0.1, ok=False)
+    assert breaker.state == "open" and breaker.trips == 1
+
+
+def test_open_rejects_until_cooldown_then_one_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_s=30)
+    trip(breaker)
+    assert not breaker.allow()
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 2
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()              # only one probe at a time
+    assert breaker.rejected == 3
+    breaker.record(0.2, ok=True)
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_s=30)
+    trip(breaker)
+    clock[0] += 31
+    assert breaker.allow()
+    breaker.record(0.2, ok=False)
+    assert breaker.state == "open" and breaker.trips == 2
+    assert not breaker.allow()
+
+
+def test_abandoned_probe_expires(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_s=30)
+    trip(breaker)
+    clock[0] += 31
+    assert breaker.allow()                  # probe never reports back
+    clock[0] += 31
+    assert breaker.allow()
+
+
+def test_run_fails_fast_while_open(clock):
+    guard = Resilience(CircuitBreaker(failure_threshold=1, cooldown_s=30), hedge=False)
+    trip(guard.breaker)
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(guard.run(lambda: calls.append(1)))
+    assert calls == []
+
+
+def test_claude_client_gives_up_within_the_budget(monkeypatch):
+    pytest.importorskip("anthropic")
+    import main
+    monkeypatch.setattr(main, "ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(main, "_claude_client", None)
+    client = main.get_claude_client()
+    assert client.max_retries == 0
+    assert client.timeout == main.llm_guard.budget_s
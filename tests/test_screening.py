@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from data.legal_data import STATES
+from screening import MAX_LINE_CHARS, NATIONAL_INCOME_LIMIT, evaluate_batch, screen
+
+STATE = next(iter(STATES))
+LIMIT = STATES[STATE]["income_limit_legal_aid"]
+
+
+def run(data: bytes, fmt: str = "csv", chunk: int = 7, batch_size: int = 2000) -> list:
+    async def chunks():
+        for i in range(0, len(data), chunk):       # small chunks: lines and UTF-8 split across reads
+            yield data[i:i + chunk]
+
+    async def collect():
+        return [json.loads(line) async for line in screen(chunks(), fmt, batch_size)]
+    return asyncio.run(collect())
+
+
+def one(**row) -> dict:
+    return next(evaluate_batch([row], 1))
+
+
+def test_income_against_state_limit():
+    assert one(state=STATE, annual_income=str(LIMIT))["reason"] == "income_within_limit"
+    assert one(state=STATE, annual_income=f"{LIMIT + 1:,}")["reason"] == "income_above_limit"
+    assert one(state=STATE.upper(), annual_income=LIMIT)["eligible"]
+
+
+def test_unknown_state_uses_national_limit():
+    assert one(state="atlantis", annual_income=NATIONAL_INCOME_LIMIT)["eligible"]
+    assert not one(state="atlantis", annual_income=NATIONAL_INCOME_LIMIT + 1)["eligible"]
+
+
+def test_category_synonyms_are_eligible_regardless_of_income():
+    for category, canonical in (("Women", "woman"), ("female", "woman"), ("children", "child"),
+                                ("SC/ST", "sc"), ("Scheduled Tribe", "st"), ("differently-abled", "disabled")):
+        out = one(state=STATE, annual_income=10 * LIMIT, category=category)
+        assert out["eligible"] and out["reason"] == f"category:{canonical}", category
+
+
+def test_unrecognised_category_is_flagged_not_rejected():
+    out = one(state=STATE, annual_income=10 * LIMIT, category="widow")
+    assert out["reason"] == "unknown_category" and out["category"] == "widow"
+    assert one(state=STATE, annual_income=10 * LIMIT, category="general")["reason"] == "income_above_limit"
+    assert one(state=STATE, annual_income=LIMIT, category="widow")["reason"] == "income_within_limit"
+
+
+def test_missing_income():
+    assert one(state=STATE, annual_income="")["reason"] == "missing_or_invalid_income"
+    assert one(state=STATE, annual_income="n/a")["reason"] == "missing_or_invalid_income"
+    assert one(state=STATE, category="child")["eligible"]
+
+
+def test_csv_stream_with_summary():
+    rows = "".join(f"{STATE},{LIMIT if i % 2 else LIMIT * 2},\r\n" for i in range(25))
+    out = run(("﻿State,Annual_Income,Category\r\n" + rows).encode(), batch_size=10)
+    assert [r["row"] for r in out[:-1]] == list(range(1, 26))
+    assert out[-1] == {"summary": {"screened": 25, "eligible": 12, "not_eligible": 13}}
+
+
+def test_ndjson_with_bad_lines():
+    lines = [json.dumps({"state": STATE, "annual_income": 1, "category": "महिला"}), "not json", "[1, 2]"]
+    out = run("\n".join(lines).encode("utf-8"), fmt="ndjson")
+    assert out[0]["eligible"]
+    assert [r["reason"] for r in out[1:3]] == ["missing_or_invalid_income"] * 2
+
+
+def test_over_long_line_is_dropped():
+    data = f"state,annual_income\n{STATE},{'9' * (MAX_LINE_CHARS + 10)}\n{STATE},1\n".encode()
+    out = run(data, chunk=4096)
+    assert [r["reason"] for r in out[:-1]] == ["line_too_long", "income_within_limit"]
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import SingleFlight, StreamFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "reply"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["reply"] * 5
+    assert len(runs) == 1
+    assert flight.stats() == {"inflight": 0, "upstream_calls": 1, "coalesced": 4}
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    release = None
+
+    async def fetch():
+        await release.wait()
+        return "reply"
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        leader = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()                     # the first client disconnects
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        release.set()
+        return await follower
+
+    assert asyncio.run(scenario()) == "reply"
+    assert flight.calls == 1 and flight.shared == 1
+
+
+def test_error_reaches_every_caller_and_clears_the_key():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.stats()["inflight"] == 0
+        await asyncio.gather(flight.do("k", fail), return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert flight.calls == 2                # nothing is cached after completion
+
+
+def gated_stream(gate: threading.Event, error: Exception = None):
+    def open_stream():
+        yield "a"
+        yield "b"
+        gate.wait(5)
+        yield "c"
+        if error:
+            raise error
+        yield "d"
+    return open_stream
+
+
+async def drain(stream) -> list:
+    return [chunk async for chunk in stream]
+
+
+def test_late_joiner_replays_prefix_then_follows_live():
+    flight = StreamFlight()
+    gate = threading.Event()
+
+    async def scenario():
+        first = flight.subscribe("k", gated_stream(gate))
+        assert [await first.__anext__(), await first.__anext__()] == ["a", "b"]
+        late = flight.subscribe("k", gated_stream(gate))     # joins mid-stream
+        assert [await late.__anext__(), await late.__anext__()] == ["a", "b"]
+        gate.set()
+        return await drain(first), await drain(late)
+
+    rest_first, rest_late = asyncio.run(scenario())
+    assert rest_first == rest_late == ["c", "d"]
+    assert flight.stats() == {"inflight": 0, "upstream_calls": 1, "coalesced": 1}
+
+
+def test_stream_error_reaches_every_subscriber_after_the_prefix():
+    flight = StreamFlight()
+    gate = threading.Event()
+
+    async def scenario():
+        first = flight.subscribe("k", gated_stream(gate, RuntimeError("upstream down")))
+        assert await first.__anext__() == "a"
+        late = flight.subscribe("k", gated_stream(gate))
+        gate.set()
+        got = []
+        for stream in (first, late):
+            chunks = []
+            with pytest.raises(RuntimeError, match="upstream down"):
+                async for chunk in stream:
+                    chunks.append(chunk)
+            got.append(chunks)
+        return got
+
+    assert asyncio.run(scenario()) == [["b", "c"], ["a", "b", "c"]]
+    assert flight.stats()["inflight"] == 0
@@ -0,0 +1,34 @@
+import os
+import re
+import subprocess
+import sys
+
+from conftest import ROOT
+
+# Cumulative `import main` time; generous for CI noise, but a heavy eager import trips it
+IMPORT_BUDGET_MS = float(os.getenv("JUSTIA_IMPORT_BUDGET_MS", "1500"))
+LAZY_MODULES = ("anthropic", "numpy")
+
+
+def _import_main(code: str = "") -> subprocess.CompletedProcess:
+    tests = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([tests, ROOT])}
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import conftest\nimport main\n{code}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+
+
+def test_import_main_within_budget():
+    proc = _import_main()
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| main$", proc.stderr, re.M)
+    assert match, "no importtime line for main"
+    took_ms = int(match.group(1)) / 1000
+    assert took_ms <= IMPORT_BUDGET_MS, f"import main took {took_ms:.0f}ms (budget {IMPORT_BUDGET_MS:.0f}ms)"
+
+
+def test_heavy_modules_stay_lazy():
+    proc = _import_main(f"import sys; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip() == "", f"imported at start-up: {proc.stdout.strip()}"
@@ -0,0 +1,370 @@
+# ═══════════════════════════════════════════════════════════════
+#  JUSTIA — WebSocket chat transport
+#  Many sessions and turns over one connection: server-pushed token
+#  deltas, heartbeats, resumable message ids and credit-based flow
+#  control, on top of the same reply pipeline as /api/chat/stream
+# ═══════════════════════════════════════════════════════════════
+
+import hmac
+import json
+import time
+import uuid
+import asyncio
+import secrets
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Optional
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from singleflight import Broadcast
+
+HISTORY_MESSAGES = 20   # kept per session; build_messages() sends the last 10
+KEEP_TURNS = 4          # turns per session still replayable after a reconnect
+
+# Client → server (JSON text frames):
+#   {"type": "hello", "window": 64}                  opt in to credit flow control
+#   {"type": "ack", "credits": 32}                   grant more delta frames
+#   {"type": "chat", "session_id"?, "resume_token"?, "message", "language"?, "state"?, "case_type"?}
+#   {"type": "resume", "session_id", "resume_token"?, "msg_id", "seq"}
+#   {"type": "ping"} | {"type": "pong"}
+# Server → client:
+#   {"type": "start", "session_id", "msg_id", "resume_token"?}   token only when the session is created
+#
+# Session ids are issued by the server (omit session_id to start one). A connection
+# may use the sessions it created; any other connection, e.g. after a reconnect,
+# must present that session's resume_token once to attach to it.
+#   {"type": "delta", "session_id", "msg_id", "seq", "delta"}   seq = chunks delivered so far
+#   {"type": "done", "session_id", "msg_id", "seq"}
+#   {"type": "error", "code", "message", ...}
+#   {"type": "ping", "t"} | {"type": "pong"}
+
+
+# ── SESSIONS ─────────────────────────────────────────────────────
+class Session:
+    __slots__ = ("id", "token", "language", "state", "case_type", "history", "next_msg_id", "turns", "active",
+                 "last_seen")
+
+    def __init__(self, id: str):
+        self.id = id
+        self.token = secrets.token_urlsafe(24)      # proves ownership when another connection attaches
+        self.language = "en"
+        self.state: Optional[str] = None
+        self.case_type: Optional[str] = None
+        self.history: list = []                     # [{"role", "content"}]
+        self.next_msg_id = 1
+        self.turns: OrderedDict = OrderedDict()     # msg_id → Broadcast
+        self.active: Optional[int] = None           # msg_id of the turn being generated
+        self.last_seen = time.monotonic()
+
+
+class SessionStore:
+    """
+    Sessions belong to the worker, not to a connection, so a client that
+    reconnects can resume a turn that kept generating while it was away.
+    """
+
+    def __init__(self, ttl: float = 1800, max_sessions: int = 50000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict = OrderedDict()
+
+    def create(self) -> Session:
+        self._evict()
+        session = Session(uuid.uuid4().hex)
+        self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id) -> Optional[Session]:
+        self._evict()
+        session = self._sessions.get(session_id) if isinstance(session_id, str) else None
+        if session is not None:
+            session.last_seen = time.monotonic()
+            self._sessions.move_to_end(session.id)
+        return session
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_seen >= cutoff and len(self._sessions) < self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+# ── HUB: turns outlive connections ───────────────────────────────
+class ChatHub:
+    """
+    `reply(session, message)` returns the async iterator of text deltas for one
+    turn. Each turn runs as its own task and buffers into a Broadcast, so a slow
+    or disconnected client never stalls generation and can replay from any seq.
+    """
+
+    def __init__(self, reply: Callable[[Session, str], AsyncIterator[str]], store: SessionStore,
+                 heartbeat_s: float = 20.0, send_queue: int = 256, max_streams: int = 32,
+                 on_turn: Optional[Callable[[Session, int, str, str], None]] = None,
+                 allowed: Optional[dict] = None, coalesce_s: float = 0.05):
+        self.reply = reply
+        self.on_turn = on_turn          # (session, msg_id, message, reply) after each completed turn
+        self.allowed = allowed or {}    # session field → accepted values (language, state, case_type)
+        self.coalesce_s = coalesce_s    # at most one delta frame per stream per this many seconds
+        self.store = store
+        self.heartbeat_s = heartbeat_s
+        self.send_queue = send_queue
+        self.max_streams = max_streams
+        self._tasks: set = set()
+        self.connections = 0
+        self.turns = 0
+        self.resumes = 0
+        self.frames_sent = 0
+
+    def start_turn(self, session: Session, message: str) -> tuple:
+        msg_id = session.next_msg_id
+        session.next_msg_id += 1
+        bc = Broadcast()
+        session.turns[msg_id] = bc
+        while len(session.turns) > KEEP_TURNS:
+            session.turns.popitem(last=False)
+        session.active = msg_id
+        self.turns += 1
+        task = asyncio.create_task(self._run_turn(session, msg_id, message, bc))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return msg_id, bc
+
+    async def _run_turn(self, session: Session, msg_id: int, message: str, bc: Broadcast):
+        try:
+            async for text in self.reply(session, message):
+                bc.push(text)
+        except Exception as e:
+            print(f"WebSocket turn {session.id}/{msg_id} failed: {e!r}")
+            bc.finish(e)
+        else:
+            session.history.append({"role": "user", "content": message})
+            session.history.append({"role": "assistant", "content": "".join(bc.chunks)})
+            del session.history[:-HISTORY_MESSAGES]
+            bc.finish()
+            if self.on_turn is not None:
+                self.on_turn(session, msg_id, message, session.history[-1]["content"])
+        finally:
+            if session.active == msg_id:
+                session.active = None
+
+    async def serve(self, ws: WebSocket):
+        await ws.accept()
+        self.connections += 1
+        try:
+            await _Connection(self, ws).run()
+        finally:
+            self.connections -= 1
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "sessions": len(self.store),
+            "turns": self.turns,
+            "turns_running": len(self._tasks),
+            "resumes": self.resumes,
+            "frames_sent": self.frames_sent,
+        }
+
+
+# ── ONE CONNECTION ───────────────────────────────────────────────
+class _Connection:
+    def __init__(self, hub: ChatHub, ws: WebSocket):
+        self.hub = hub
+        self.ws = ws
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=hub.send_queue)
+        self.credits: Optional[int] = None          # None until the client sends "hello"
+        self._credit = asyncio.Event()
+        self.streams: dict = {}                     # (session_id, msg_id) → forwarding task
+        self.owned: set = set()                     # session ids this connection may use
+        self.last_rx = time.monotonic()
+
+    async def run(self):
+        tasks = [asyncio.create_task(c) for c in (self._receive(), self._send(), self._heartbeat())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks + list(self.streams.values()):
+                task.cancel()
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+
+    # ── inbound ───────────────────────────────────────────────────
+    async def _receive(self):
+        try:
+            while True:
+                raw = await self.ws.receive_text()
+                self.last_rx = time.monotonic()
+                try:
+                    msg = json.loads(raw)
+                except json.JSONDecodeError:
+                    msg = None
+                if not isinstance(msg, dict):
+                    await self._error("bad_frame", "Frames must be JSON objects")
+                    continue
+                await self._handle(msg)
+        except WebSocketDisconnect:
+            pass
+
+    async def _handle(self, msg: dict):
+        kind = msg.get("type")
+        if kind == "chat":
+            await self._chat(msg)
+        elif kind == "resume":
+            await self._resume(msg)
+        elif kind == "hello":
+            window = msg.get("window")
+            if isinstance(window, int) and window > 0:
+                self.credits = window
+                self._credit.set()
+        elif kind == "ack":
+            credits = msg.get("credits")
+            if self.credits is not None and isinstance(credits, int) and credits > 0:
+                self.credits += credits
+                self._credit.set()
+        elif kind == "ping":
+            await self._queue({"type": "pong"})
+        elif kind != "pong":
+            await self._error("unknown_type", f"Unknown frame type {kind!r}")
+
+    def _session(self, msg: dict) -> Optional[Session]:
+        """The session a frame names, if this connection owns it or presents its resume token."""
+        session = self.hub.store.get(msg.get("session_id"))
+        if session is None:
+            return None
+        if session.id not in self.owned:
+            token = msg.get("resume_token")
+            if not isinstance(token, str) or not hmac.compare_digest(token.encode(), session.token.encode()):
+                return None                         # same answer as unknown: ids are not an oracle
+            self.owned.add(session.id)
+        return session
+
+    async def _chat(self, msg: dict):
+        message = msg.get("message")
+        if not isinstance(message, str) or not message.strip():
+            await self._error("bad_request", "'message' is required", session_id=msg.get("session_id"))
+            return
+        for field, values in self.hub.allowed.items():
+            value = msg.get(field)
+            if value is not None and (not isinstance(value, str) or value not in values):
+                await self._error("bad_request", f"Unsupported {field} {value!r}", session_id=msg.get("session_id"))
+                return
+        created = msg.get("session_id") is None
+        if created:
+            session = self.hub.store.create()
+            self.owned.add(session.id)
+        else:
+            session = self._session(msg)
+            if session is None:
+                await self._error("unknown_session", "Session not found; omit session_id to start a new one",
+                                  session_id=msg.get("session_id"))
+                return
+        if session.active is not None:
+            await self._error("turn_in_progress", "Wait for the current reply to finish",
+                              session_id=session.id, msg_id=session.active)
+            return
+        if len(self.streams) >= self.hub.max_streams:
+            await self._error("too_many_streams", f"At most {self.hub.max_streams} replies at once per connection",
+                              session_id=session.id)
+            return
+        for field in ("language", "state", "case_type"):
+            if msg.get(field) is not None:
+                setattr(session, field, msg[field])
+        msg_id, bc = self.hub.start_turn(session, message)
+        start = {"type": "start", "session_id": session.id, "msg_id": msg_id}
+        if created:
+            start["resume_token"] = session.token
+        await self._queue(start)
+        self._forward(session.id, msg_id, bc, 0)
+
+    async def _resume(self, msg: dict):
+        session = self._session(msg)
+        bc = session.turns.get(msg.get("msg_id")) if session else None
+        seq = msg.get("seq", 0)
+        if bc is None or not isinstance(seq, int) or not 0 <= seq <= len(bc.chunks):
+            await self._error("resume_unavailable", "Turn not found on this server; resend the message",
+                              session_id=msg.get("session_id"), msg_id=msg.get("msg_id"))
+            return
+        self.hub.resumes += 1
+        self._forward(session.id, msg["msg_id"], bc, seq)
+
+    def _forward(self, session_id: str, msg_id: int, bc: Broadcast, seq: int):
+        key = (session_id, msg_id)
+        old = self.streams.pop(key, None)
+        if old is not None:
+            old.cancel()
+        task = asyncio.create_task(self._pump(session_id, msg_id, bc, seq))
+        self.streams[key] = task
+
+        def untrack(t):
+            if self.streams.get(key) is t:
+                del self.streams[key]
+        task.add_done_callback(untrack)
+
+    async def _pump(self, session_id: str, msg_id: int, bc: Broadcast, seq: int):
+        # Whatever has accumulated since the last frame goes out as one delta,
+        # so a backlogged client gets fewer, larger frames instead of falling further behind.
+        # The first delta goes out at once; after that, one per coalesce_s: per-frame
+        # cost dominates when a reply streams a few characters at a time.
+        last_frame = 0.0
+        while True:
+            end = len(bc.chunks)
+            if seq < end:
+                linger = self.hub.coalesce_s - (time.monotonic() - last_frame)
+                if linger > 0 and not bc.done:
+                    await asyncio.sleep(linger)
+                await self._take_credit()
+                end = len(bc.chunks)
+                delta = "".join(bc.chunks[seq:end])
+                seq = end
+                await self._queue({"type": "delta", "session_id": session_id, "msg_id": msg_id,
+                                   "seq": seq, "delta": delta})
+                last_frame = time.monotonic()
+                continue
+            if bc.done:
+                if bc.error is not None:
+                    await self._error("reply_failed", "The reply could not be completed",
+                                      session_id=session_id, msg_id=msg_id, seq=seq)
+                else:
+                    await self._queue({"type": "done", "session_id": session_id, "msg_id": msg_id, "seq": seq})
+                return
+            await bc.wait()
+
+    # ── outbound ──────────────────────────────────────────────────
+    async def _queue(self, frame: dict):
+        # bounded: a client that stops reading blocks its own pumps, nothing else
+        await self.outbox.put(frame)
+
+    async def _error(self, code: str, message: str, **fields):
+        await self._queue({"type": "error", "code": code, "message": message, **fields})
+
+    async def _take_credit(self):
+        # taken by the pumps, not the sender, so control frames and acks never queue behind a closed window
+        if self.credits is None:
+            return
+        while self.credits <= 0:
+            self._credit.clear()
+            await self._credit.wait()
+        self.credits -= 1
+
+    async def _send(self):
+        while True:
+            frame = await self.outbox.get()
+            await self.ws.send_text(json.dumps(frame, ensure_ascii=False))
+            self.hub.frames_sent += 1
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.hub.heartbeat_s)
+            if time.monotonic() - self.last_rx > 3 * self.hub.heartbeat_s:
+                return                              # peer is gone; run() closes the socket
+            try:
+                self.outbox.put_nowait({"type": "ping", "t": time.time()})
+            except asyncio.QueueFull:
+                pass                                # backlogged already; it will hear from us